@@ -1,6 +1,6 @@
 from pathlib import Path
 import os
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'users.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -206,38 +208,169 @@ SIMPLE_JWT = {
 
 
 
+# The ASGI login endpoint (/api/users/login-async/) verifies passwords in a
+# process pool of LOGIN_HASH_WORKERS processes and sheds attempts with 503
+# once LOGIN_HASH_MAX_PENDING checks are queued in a worker.
+LOGIN_HASH_WORKERS = config("LOGIN_HASH_WORKERS", default=2, cast=int)
+LOGIN_HASH_MAX_PENDING = config("LOGIN_HASH_MAX_PENDING", default=32, cast=int)
+LOGIN_HASH_TIMEOUT = config("LOGIN_HASH_TIMEOUT", default=5.0, cast=float)
+
+
+
+# With LAST_LOGIN_WRITE_BEHIND, logins buffer last_login and workers write
+# them in one bulk UPDATE every LAST_LOGIN_FLUSH_INTERVAL seconds (and on
+# shutdown) instead of one row write per login. The buffer is a Redis hash
+# shared by all workers when REDIS_URL is set; otherwise it is per-process
+# memory and unflushed logins are lost if a worker is killed.
+LAST_LOGIN_WRITE_BEHIND = config("LAST_LOGIN_WRITE_BEHIND", default=False, cast=bool)
+LAST_LOGIN_FLUSH_INTERVAL = config("LAST_LOGIN_FLUSH_INTERVAL", default=30, cast=float)
+
+
+
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    # Per-process cache; fine for development, use REDIS_URL when running
+    # several workers so invalidations are seen by all of them.
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Rate limiting for the authentication endpoints (users.ratelimit). Counters
+# live in Redis when REDIS_URL is set so limits hold across workers.
+RATE_LIMIT_ENABLED = config("RATE_LIMIT_ENABLED", default=True, cast=bool)
+RATE_LIMIT_REDIS_URL = REDIS_URL
+RATE_LIMIT_BACKEND = config(
+    "RATE_LIMIT_BACKEND",
+    default="users.ratelimit.RedisBackend" if REDIS_URL else "users.ratelimit.LocalBackend",
+)
+
+LAST_LOGIN_REDIS_URL = REDIS_URL
+LAST_LOGIN_BACKEND = config(
+    "LAST_LOGIN_BACKEND",
+    default="users.last_login.RedisBackend" if REDIS_URL else "users.last_login.LocalBackend",
+)
+
+# Calling code assumed for mobile numbers given in national format (e.g.
+# 0712 345 678) without a country_code; numbers are stored in E.164.
+DEFAULT_PHONE_COUNTRY_CODE = config("DEFAULT_PHONE_COUNTRY_CODE", default="254")
+
+# Authenticated principals resolved by CookieJWTAuthentication are cached for
+# this many seconds (0 disables the cache).
+USER_CACHE_ALIAS = "default"
+USER_CACHE_TTL = config("USER_CACHE_TTL", default=60, cast=int)
+
+# Per-request profiling (users.middleware.RequestTimingMiddleware). Requests
+# slower than PERF_SLOW_REQUEST_MS are logged to "users.perf" with their
+# PERF_TOP_QUERIES most expensive statements.
+PERF_SERVER_TIMING = config("PERF_SERVER_TIMING", default=True, cast=bool)
+PERF_SLOW_REQUEST_MS = config("PERF_SLOW_REQUEST_MS", default=500, cast=int)
+PERF_TOP_QUERIES = config("PERF_TOP_QUERIES", default=5, cast=int)
+
+# Prometheus metrics at /metrics (users.metrics). Under gunicorn, export
+# PROMETHEUS_MULTIPROC_DIR (an empty, writable directory) in the environment
+# before start so samples aggregate across workers; see gunicorn.conf.py.
+# When METRICS_AUTH_TOKEN is set, scrapes must send "Authorization: Bearer <token>".
+METRICS_AUTH_TOKEN = config("METRICS_AUTH_TOKEN", default="")
+
+
+
+# Logging. Records are written as JSON lines by a background listener
+# thread (users.log.QueueListenerHandler), never on the request thread.
+# LOG_LEVELS overrides individual loggers, e.g. "django.db.backends=DEBUG,users=WARNING".
+# LOG_SAMPLE_RATES keeps only a fraction of sub-ERROR records from noisy
+# loggers, e.g. "users.ratelimit=0.1,users.perf=0.5".
+# LOG_FILE="" logs to stderr instead of a file.
+LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+LOG_LEVELS = dict(item.split("=", 1) for item in config("LOG_LEVELS", default="", cast=Csv()))
+LOG_SAMPLE_RATES = dict(item.split("=", 1) for item in config("LOG_SAMPLE_RATES", default="", cast=Csv()))
+LOG_FILE = config("LOG_FILE", default="debug.log")
+
 LOGGING = {
     "version":1,
     "disable_existing_loggers":False,
+    "formatters":{
+        "json":{
+            "()":"users.log.JSONFormatter",
+        },
+    },
+    "filters":{
+        "sampling":{
+            "()":"users.log.SamplingFilter",
+            "rates":LOG_SAMPLE_RATES,
+        },
+    },
     "handlers":{
-        "file":{
-            "level":"DEBUG",
-            "class":"logging.FileHandler",
-            "filename":"debug.log",
+        "queue":{
+            "()":"users.log.QueueListenerHandler",
+            "filename":LOG_FILE or None,
+            "formatter":"json",
+            "filters":["sampling"],
         },
     },
+    "root":{
+        "handlers":["queue"],
+        "level":LOG_LEVEL,
+    },
     "loggers":{
-        "django":{
-            "handlers":["file"],
-            "level":"DEBUG",
-            "propagate":True,
-        }
-    }
+        name:{"level":level} for name, level in LOG_LEVELS.items()
+    },
 }
 
 
 # Database
-
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
-        "NAME": config("DB_NAME"),
-        "USER": config("DB_USER"),
-        "PASSWORD": config("DB_PASSWORD"),
-        "HOST": config("DB_HOST", default="localhost"),
-        "PORT": config("DB_PORT", default="5432"),
+# DB_ENGINE=sqlite runs against a local SQLite file (DB_NAME, default
+# db.sqlite3) for quick local runs and benchmarks; PostgreSQL-only features
+# such as trigram search and the connection pool are skipped there.
+DB_ENGINE = config("DB_ENGINE", default="postgresql")
+
+if DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": config("DB_NAME", default=str(BASE_DIR / "db.sqlite3")),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": config("DB_NAME"),
+            "USER": config("DB_USER"),
+            "PASSWORD": config("DB_PASSWORD"),
+            "HOST": config("DB_HOST", default="localhost"),
+            "PORT": config("DB_PORT", default="5432"),
+            # Ping reused connections before handing them to a request.
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
     }
-}
+
+    # Connection reuse. DB_POOL=True uses psycopg 3's connection pool (one pool
+    # per worker process); otherwise connections persist for DB_CONN_MAX_AGE
+    # seconds. Pool usage is reported at /api/metrics/db-pool/.
+    DB_POOL = config("DB_POOL", default=False, cast=bool)
+
+    if DB_POOL:
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+            "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+            "max_idle": config("DB_POOL_MAX_IDLE", default=300, cast=float),
+            "max_lifetime": config("DB_POOL_MAX_LIFETIME", default=3600, cast=float),
+        }
+    else:
+        DATABASES["default"]["CONN_MAX_AGE"] = config("DB_CONN_MAX_AGE", default=60, cast=int)
 
 
 
@@ -256,6 +389,16 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.BasicAuthentication',    
 
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'users.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'users.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'EXCEPTION_HANDLER': 'users.custom.custom_exception_handler',
 }
 
 # Password validation
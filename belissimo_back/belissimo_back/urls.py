@@ -1,8 +1,11 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from users.metrics import metrics_view
+
 
 urlpatterns = [   
     path("admin/", admin.site.urls),
     path('api/', include('users.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,32 @@
+import glob
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+# The async login path (users/login-async/) needs the ASGI application:
+#   GUNICORN_APP=belissimo_back.asgi:application
+#   GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker
+wsgi_app = os.environ.get("GUNICORN_APP", "belissimo_back.wsgi:application")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+
+
+def on_starting(server):
+    # Samples left by a previous run would be summed into the new counters.
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, "*.db")):
+            os.remove(path)
+
+
+def worker_exit(server, worker):
+    # Persist last_login timestamps still buffered.
+    from users.last_login import flush_last_logins
+    flush_last_logins()
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges from /metrics.
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
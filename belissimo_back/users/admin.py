@@ -1,6 +1,8 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import User
+from .models import EmailOutbox, User, UserCredentialChallenge
 
-admin.site.register(User)
\ No newline at end of file
+admin.site.register(User)
+admin.site.register(UserCredentialChallenge)
+admin.site.register(EmailOutbox)
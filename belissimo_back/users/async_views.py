@@ -0,0 +1,85 @@
+import json
+import math
+
+from asgiref.sync import sync_to_async
+
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.core.exceptions import ValidationError
+
+from .custom import custom_json_response
+from .hashing import HashingOverloaded, hash_password, password_needs_rehash, verify_password
+from .last_login import arecord_login
+from .models import User
+from .serializers import UserLoginSerializer
+from .ratelimit import check_rate_limits
+from .views import LOGIN_RATE_LIMITS, login_response
+
+
+def error_response(message, status_code, headers=None):
+    return custom_json_response(message=message, status='error', status_code=status_code, headers=headers)
+
+
+@csrf_exempt
+@require_POST
+async def async_login(request):
+    """
+    Login for the ASGI application.
+
+    Same contract as ``UserViewSet.login`` but the password hash is verified
+    in the bounded hashing process pool, so the event loop keeps serving
+    other requests during a login burst. When the pool's queue is full, or
+    the check does not finish within ``LOGIN_HASH_TIMEOUT``, the attempt is
+    rejected with 503 and ``Retry-After``.
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return error_response('Invalid JSON body', 400)
+
+    retry_after = await sync_to_async(check_rate_limits)(LOGIN_RATE_LIMITS, request, payload)
+    if retry_after is not None:
+        return error_response(
+            'Too many login attempts, please try again later',
+            429,
+            headers={'Retry-After': str(math.ceil(retry_after))},
+        )
+
+    serializer = UserLoginSerializer(data=payload)
+    if not serializer.is_valid():
+        return error_response(serializer.errors, 400)
+
+    email_address = serializer.validated_data['email_address']
+    password = serializer.validated_data['password']
+
+    user = await User.objects.filter(email_address=email_address).afirst()
+    try:
+        password_ok = await verify_password(password, user.password if user else None)
+    except HashingOverloaded:
+        return error_response(
+            'Too many login attempts in progress, please retry shortly',
+            503,
+            headers={'Retry-After': '1'},
+        )
+
+    if not user or not password_ok or not user.is_active:
+        return error_response('Invalid email or password', 401)
+
+    try:
+        user.validate_for_login()
+    except ValidationError as e:
+        return error_response(str(e), 403)
+
+    if password_needs_rehash(user.password):
+        # As User.check_password does on the sync path, upgrade the stored
+        # hash to the current hasher and work factor.
+        try:
+            user.password = await hash_password(password)
+        except HashingOverloaded:
+            pass  # upgraded on a later login
+        else:
+            await user.asave(update_fields=['password'])
+
+    await arecord_login(user)
+
+    return login_response(user)
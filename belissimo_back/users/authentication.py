@@ -1,4 +1,9 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import cache_user, get_cached_user
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -9,3 +14,34 @@ class CookieJWTAuthentication(JWTAuthentication):
 
         validated_token = self.get_validated_token(access_token)
         return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        """
+        Resolve the token's user from the short-TTL user cache, falling back
+        to the database lookup on a miss.
+        """
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        cached = get_cached_user(user_id)
+        if cached is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+            return user
+        user, password_digest = cached
+
+        # The database path runs these checks on every lookup; cached users
+        # must go through them too since the revoke claim is per token.
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != password_digest:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
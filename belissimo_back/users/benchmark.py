@@ -0,0 +1,266 @@
+import math
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import User
+
+BENCH_PASSWORD = 'Bench!Passw0rd'
+
+
+@contextmanager
+def isolated_database(keepdb=False, **overrides):
+    """
+    Run against a throwaway test database with rate limiting and real email
+    delivery switched off; ``overrides`` are applied on top.
+    """
+    overrides = {
+        'RATE_LIMIT_ENABLED': False,
+        'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+        'PERF_SLOW_REQUEST_MS': 10 ** 9,
+        **overrides,
+    }
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0, keepdb=keepdb)
+    old_config = runner.setup_databases()
+    try:
+        with override_settings(**overrides):
+            yield
+    finally:
+        runner.teardown_databases(old_config)
+        teardown_test_environment()
+
+
+class Scenario:
+    """
+    One benchmarked call.
+
+    ``prepare(i)`` runs untimed before call ``i`` and returns the keyword
+    arguments for ``request(client, **kwargs)``, which is timed together
+    with the queries it runs. Responses must have ``expected_status``.
+    """
+
+    def __init__(self, name, client, request, expected_status=200, prepare=None):
+        self.name = name
+        self.client = client
+        self.request = request
+        self.expected_status = expected_status
+        self.prepare = prepare or (lambda i: {})
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(samples)))
+    return samples[rank - 1]
+
+
+def run_scenario(scenario, iterations, warmup=5):
+    """Run a scenario and return latency percentiles, throughput and queries per call"""
+    for i in range(warmup):
+        run_once(scenario, -1 - i)
+
+    latencies = []
+    queries = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        kwargs = scenario.prepare(i)
+        with CaptureQueriesContext(connection) as captured:
+            call_started = time.perf_counter()
+            response = scenario.request(scenario.client, **kwargs)
+            latencies.append(time.perf_counter() - call_started)
+        check_status(scenario, response)
+        queries.append(len(captured))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    timed = sum(latencies)
+    return {
+        'calls': iterations,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(timed / iterations * 1000, 3),
+        'rps': round(iterations / timed, 1) if timed else 0.0,
+        'queries': max(queries),
+        'queries_mean': round(sum(queries) / iterations, 2),
+        'wall_s': round(elapsed, 3),
+    }
+
+
+def run_once(scenario, i):
+    response = scenario.request(scenario.client, **scenario.prepare(i))
+    check_status(scenario, response)
+
+
+def check_status(scenario, response):
+    if response.status_code != scenario.expected_status:
+        raise AssertionError(
+            f"{scenario.name}: expected HTTP {scenario.expected_status}, "
+            f"got {response.status_code}: {response.content[:300]!r}"
+        )
+
+
+def seed_users(count, batch_size=1000):
+    """
+    Create ``count`` verified tenants and landlords sharing one password
+    hash, plus the admin and member accounts the scenarios log in as.
+    """
+    password = make_password(BENCH_PASSWORD)
+    now = timezone.now()
+    users = [
+        User(
+            email_address=f'bench{i}@example.com',
+            firstname=f'First{i}',
+            lastname=f'Last{i}',
+            country_code='+254',
+            mobile_number=f'+2547{i:08d}',
+            role='landlord' if i % 4 == 0 else 'tenant',
+            password=password,
+            verified_at=now,
+        )
+        for i in range(count)
+    ]
+    User.objects.bulk_create(users, batch_size=batch_size)
+    admin = User.objects.create_superuser('bench-admin@example.com', BENCH_PASSWORD, firstname='Bench')
+    member = User.objects.create_user(
+        'bench-member@example.com', BENCH_PASSWORD, firstname='Bench', lastname='Member', verified_at=now,
+    )
+    return admin, member
+
+
+def logged_in_client(email_address):
+    """An APIClient holding the JWT cookies set by a real login"""
+    client = APIClient()
+    response = client.post(
+        '/api/users/login/',
+        {'email_address': email_address, 'password': BENCH_PASSWORD},
+        format='json',
+    )
+    if response.status_code != 200:
+        raise AssertionError(f"Login as {email_address} failed: {response.status_code}")
+    return client
+
+
+def signed_out(client, prepare=None):
+    """
+    Wrap a scenario's ``prepare`` so it first drops the JWT cookies that
+    login-like calls leave on ``client``, keeping anonymous calls anonymous.
+    """
+    def prepare_signed_out(i):
+        client.cookies.clear()
+        return prepare(i) if prepare else {}
+    return prepare_signed_out
+
+
+def build_scenarios(admin, member, run_id):
+    """The standard users API scenarios, keyed by name"""
+    anonymous = APIClient()
+    admin_client = logged_in_client(admin.email_address)
+    member_client = logged_in_client(member.email_address)
+
+    def reset_token(i):
+        return {'token': member.generate_password_reset_token()}
+
+    scenarios = [
+        Scenario(
+            'login', anonymous,
+            lambda client: client.post(
+                '/api/users/login/',
+                {'email_address': member.email_address, 'password': BENCH_PASSWORD},
+                format='json',
+            ),
+            prepare=signed_out(anonymous),
+        ),
+        Scenario(
+            'profile', member_client,
+            lambda client: client.get('/api/users/profile/'),
+        ),
+        Scenario(
+            'list_users', admin_client,
+            lambda client: client.get('/api/users/list-users/?page_size=50'),
+        ),
+        Scenario(
+            'list_users_filtered', admin_client,
+            lambda client: client.get('/api/users/list-users/?role=tenant&name=First1&page_size=50'),
+        ),
+        Scenario(
+            'list_users_phone', admin_client,
+            lambda client: client.get('/api/users/list-users/?phone=0700000&page_size=50'),
+        ),
+        Scenario(
+            'list_users_sparse', admin_client,
+            lambda client: client.get('/api/users/list-users/?page_size=50&fields=id,full_name,role'),
+        ),
+        Scenario(
+            'register', anonymous,
+            lambda client, i: client.post(
+                '/api/users/register/',
+                {
+                    'firstname': 'New',
+                    'lastname': 'User',
+                    'email_address': f'new-{run_id}-{i}@example.com',
+                    'password': BENCH_PASSWORD,
+                    'password_confirm': BENCH_PASSWORD,
+                    'role': 'tenant',
+                },
+                format='json',
+            ),
+            expected_status=201,
+            prepare=signed_out(anonymous, lambda i: {'i': i}),
+        ),
+        Scenario(
+            'reset_password', anonymous,
+            lambda client, token: client.post(
+                '/api/users/reset-password/',
+                {'token': token, 'new_password': BENCH_PASSWORD, 'password_confirm': BENCH_PASSWORD},
+                format='json',
+            ),
+            prepare=signed_out(anonymous, reset_token),
+        ),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+def check_budgets(results, budget=None, baseline=None, tolerance=0.2):
+    """
+    Compare results with absolute ``budget`` limits and/or a previous
+    ``baseline`` run, returning a list of violations.
+
+    ``budget`` maps scenario names to maximum ``p50_ms``/``p99_ms``/``queries``
+    and minimum ``rps``. Against a baseline, latencies may grow and
+    throughput may drop by ``tolerance`` (0.2 = 20%); query counts may
+    not grow at all.
+    """
+    violations = []
+    for name, result in results.items():
+        for metric, limit in (budget or {}).get(name, {}).items():
+            if metric == 'rps':
+                if result['rps'] < limit:
+                    violations.append(f"{name}: rps {result['rps']} below budget {limit}")
+            elif result[metric] > limit:
+                violations.append(f"{name}: {metric} {result[metric]} over budget {limit}")
+
+        previous = (baseline or {}).get(name)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            limit = previous[metric] * (1 + tolerance)
+            if result[metric] > limit:
+                violations.append(
+                    f"{name}: {metric} {result[metric]} regressed from {previous[metric]} "
+                    f"(limit {limit:.3f})"
+                )
+        if result['rps'] < previous['rps'] * (1 - tolerance):
+            violations.append(f"{name}: rps {result['rps']} regressed from {previous['rps']}")
+        if result['queries'] > previous['queries']:
+            violations.append(f"{name}: queries {result['queries']} up from {previous['queries']}")
+    return violations
@@ -0,0 +1,301 @@
+import itertools
+import tracemalloc
+from collections import Counter
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .benchmark import BENCH_PASSWORD, Scenario, check_status, logged_in_client, signed_out
+from .models import User
+
+# Transaction control is logged differently per backend (SQLite logs BEGIN,
+# PostgreSQL does not), so it is reported but not counted.
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+
+# Maximum queries and peak traced Python memory (KiB) per UserViewSet
+# action, for one request in the check_query_budgets harness. Lower a
+# budget when an optimisation lands so it cannot silently regress.
+ACTION_BUDGETS = {
+    'login': {'queries': 2, 'memory_kb': 256},
+    'register': {'queries': 4, 'memory_kb': 256},
+    'social_register': {'queries': 1, 'memory_kb': 256},
+    'verify': {'queries': 3, 'memory_kb': 256},
+    'resend_verification': {'queries': 3, 'memory_kb': 256},
+    'forgot_password': {'queries': 3, 'memory_kb': 256},
+    'reset_password': {'queries': 2, 'memory_kb': 256},
+    'profile': {'queries': 0, 'memory_kb': 256},
+    'update_profile': {'queries': 2, 'memory_kb': 256},
+    'list_users': {'queries': 1, 'memory_kb': 512},
+    'export_users': {'queries': 1, 'memory_kb': 512},
+    'create_landlord_or_tenant': {'queries': 6, 'memory_kb': 256},
+    'import_landlords_and_tenants': {'queries': 4, 'memory_kb': 512},
+    'list': {'queries': 1, 'memory_kb': 2048},
+    'create': {'queries': 3, 'memory_kb': 256},
+    'retrieve': {'queries': 1, 'memory_kb': 256},
+    'update': {'queries': 4, 'memory_kb': 256},
+    'partial_update': {'queries': 2, 'memory_kb': 256},
+    'destroy': {'queries': 8, 'memory_kb': 256},
+}
+
+
+class QueryBudget:
+    """
+    Count the queries and the peak traced Python memory of a block and
+    compare them with a budget::
+
+        with QueryBudget('login', queries=3, memory_kb=512) as budget:
+            client.post(...)
+        assert not budget.violations(), budget.report()
+
+    Transaction control statements are not counted. Memory is measured with
+    ``tracemalloc``, which is started for the block if it is not already
+    tracing.
+    """
+
+    def __init__(self, name, queries=None, memory_kb=None, using=connection):
+        self.name = name
+        self.max_queries = queries
+        self.max_memory_kb = memory_kb
+        self.capture = CaptureQueriesContext(using)
+        self.queries = []
+        self.peak_kb = 0.0
+        self.started_tracing = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        baseline, _ = tracemalloc.get_traced_memory()
+        self.baseline = baseline
+        tracemalloc.reset_peak()
+        self.capture.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.capture.__exit__(exc_type, exc_value, traceback)
+        # Copied now: the connection's query log is cleared on the next request.
+        self.queries = list(self.capture.captured_queries)
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak_kb = round(max(peak - self.baseline, 0) / 1024, 1)
+        if self.started_tracing:
+            tracemalloc.stop()
+
+    @property
+    def query_count(self):
+        return sum(1 for query in self.queries if not is_transaction_statement(query['sql']))
+
+    def violations(self):
+        violations = []
+        if self.max_queries is not None and self.query_count > self.max_queries:
+            violations.append(f"{self.query_count} queries, budget {self.max_queries}")
+        if self.max_memory_kb is not None and self.peak_kb > self.max_memory_kb:
+            violations.append(f"{self.peak_kb} KiB peak memory, budget {self.max_memory_kb} KiB")
+        return violations
+
+    def report(self):
+        """The budget outcome followed by every query run, repeats flagged"""
+        seen = Counter(query['sql'] for query in self.queries)
+        lines = [f"{self.name}: {'; '.join(self.violations()) or 'within budget'}"]
+        number = 0
+        for query in self.queries:
+            if is_transaction_statement(query['sql']):
+                lines.append(f"     {query['sql']}")
+                continue
+            number += 1
+            repeat = f" [x{seen[query['sql']]}]" if seen[query['sql']] > 1 else ''
+            lines.append(f"  {number}. ({query['time']}s){repeat} {query['sql']}")
+        return '\n'.join(lines)
+
+
+def is_transaction_statement(sql):
+    return sql.upper().startswith(TRANSACTION_STATEMENTS)
+
+
+def build_cases(admin, member):
+    """
+    One representative request per UserViewSet action, keyed by action.
+    ``prepare`` creates whatever the call needs outside the measured block.
+    """
+    anonymous_client = APIClient()
+    admin_client = logged_in_client(admin.email_address)
+    member_client = logged_in_client(member.email_address)
+    sequence = itertools.count()
+
+    def anonymous(prepare=None):
+        return signed_out(anonymous_client, prepare)
+
+    def new_user(**fields):
+        n = next(sequence)
+        fields.setdefault('firstname', 'Budget')
+        return User.objects.create_user(f'budget-{n}@example.com', BENCH_PASSWORD, **fields)
+
+    def unverified_user(i):
+        user = new_user()
+        return {'email': user.email_address, 'code': user.generate_verification_code()}
+
+    def social_user(i):
+        user = new_user(provider='google', uid=f'google-{i}', verified_at=timezone.now())
+        return {'email': user.email_address}
+
+    def fresh_email(i):
+        return {'email': f'budget-new-{next(sequence)}@example.com'}
+
+    def fresh_users(i):
+        return {'rows': [
+            {'firstname': 'Import', 'email_address': f'budget-import-{next(sequence)}@example.com', 'role': 'tenant'}
+            for _ in range(5)
+        ]}
+
+    def reset_token(i):
+        return {'token': member.generate_password_reset_token()}
+
+    def target_user(i):
+        return {'user': new_user(verified_at=timezone.now())}
+
+    def drain(response):
+        # Streamed bodies are produced lazily; render them inside the budget.
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def registration(email, **extra):
+        return {
+            'firstname': 'New', 'lastname': 'User', 'email_address': email,
+            'identification_number': email.split('@')[0], 'role': 'tenant', **extra,
+        }
+
+    cases = [
+        Scenario(
+            'login', anonymous_client,
+            lambda client: client.post(
+                '/api/users/login/',
+                {'email_address': member.email_address, 'password': BENCH_PASSWORD}, format='json',
+            ),
+            prepare=anonymous(),
+        ),
+        Scenario(
+            'register', anonymous_client,
+            lambda client, email: client.post(
+                '/api/users/register/',
+                registration(email, password=BENCH_PASSWORD, password_confirm=BENCH_PASSWORD), format='json',
+            ),
+            expected_status=201, prepare=anonymous(fresh_email),
+        ),
+        Scenario(
+            'social_register', anonymous_client,
+            lambda client, email: client.post(
+                '/api/users/social-register/',
+                {'firstname': 'Social', 'email_address': email, 'provider': 'google', 'uid': 'google-1', 'role': 'tenant'},
+                format='json',
+            ),
+            prepare=anonymous(social_user),
+        ),
+        Scenario(
+            'verify', anonymous_client,
+            lambda client, email, code: client.post(
+                '/api/users/verify-account/',
+                {'email_address': email, 'verification_code': code}, format='json',
+            ),
+            prepare=anonymous(unverified_user),
+        ),
+        Scenario(
+            'resend_verification', anonymous_client,
+            lambda client, email, code: client.post(
+                '/api/users/resend-verification-code/', {'email_address': email}, format='json',
+            ),
+            prepare=anonymous(unverified_user),
+        ),
+        Scenario(
+            'forgot_password', anonymous_client,
+            lambda client: client.post(
+                '/api/users/forgot-password/', {'email_address': member.email_address}, format='json',
+            ),
+            prepare=anonymous(),
+        ),
+        Scenario(
+            'reset_password', anonymous_client,
+            lambda client, token: client.post(
+                '/api/users/reset-password/',
+                {'token': token, 'new_password': BENCH_PASSWORD, 'password_confirm': BENCH_PASSWORD},
+                format='json',
+            ),
+            prepare=anonymous(reset_token),
+        ),
+        Scenario(
+            'profile', member_client,
+            lambda client: client.get('/api/users/profile/'),
+        ),
+        Scenario(
+            'update_profile', member_client,
+            lambda client: client.patch('/api/users/profile/', {'lastname': 'Member'}, format='json'),
+        ),
+        Scenario(
+            'list_users', admin_client,
+            lambda client: client.get('/api/users/list-users/?page_size=50'),
+        ),
+        Scenario(
+            'export_users', admin_client,
+            lambda client: drain(client.get('/api/users/export/?type=ndjson')),
+        ),
+        Scenario(
+            'create_landlord_or_tenant', admin_client,
+            lambda client, email: client.post(
+                '/api/users/create-landlord-tenant/', registration(email), format='json',
+            ),
+            expected_status=201, prepare=fresh_email,
+        ),
+        Scenario(
+            'import_landlords_and_tenants', admin_client,
+            lambda client, rows: client.post('/api/users/import/', rows, format='json'),
+            prepare=fresh_users,
+        ),
+        Scenario(
+            'list', admin_client,
+            lambda client: client.get('/api/users/'),
+        ),
+        Scenario(
+            'create', admin_client,
+            lambda client, email: client.post('/api/users/', registration(email), format='json'),
+            expected_status=201, prepare=fresh_email,
+        ),
+        Scenario(
+            'retrieve', admin_client,
+            lambda client, user: client.get(f'/api/users/{user.pk}/'),
+            prepare=target_user,
+        ),
+        Scenario(
+            'update', admin_client,
+            lambda client, user: client.put(
+                f'/api/users/{user.pk}/',
+                registration(user.email_address, firstname='Updated', lastname='User'), format='json',
+            ),
+            prepare=target_user,
+        ),
+        Scenario(
+            'partial_update', admin_client,
+            lambda client, user: client.patch(f'/api/users/{user.pk}/', {'lastname': 'Updated'}, format='json'),
+            prepare=target_user,
+        ),
+        Scenario(
+            'destroy', admin_client,
+            lambda client, user: client.delete(f'/api/users/{user.pk}/'),
+            prepare=target_user,
+        ),
+    ]
+    return {case.name: case for case in cases}
+
+
+def check_case(case, budget, warmup=1):
+    """
+    Run ``case`` ``warmup`` times unmeasured (filling caches and lazy
+    imports), then once inside a QueryBudget, which is returned.
+    """
+    for i in range(warmup):
+        check_status(case, case.request(case.client, **case.prepare(-1 - i)))
+    kwargs = case.prepare(0)
+    with QueryBudget(case.name, **budget) as measured:
+        response = case.request(case.client, **kwargs)
+    check_status(case, response)
+    return measured
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Credentials never go into the shared cache. A cached user loads them from
+# the database on first access, like any other deferred field.
+UNCACHED_USER_FIELDS = frozenset({'password', 'uid'})
+
+
+def _user_cache():
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def user_cache_key(user_id):
+    return f"users:principal:{user_id}"
+
+
+def get_cached_user(user_id):
+    """
+    Return ``(user, password_digest)`` for ``user_id``, or None on a miss or
+    when caching is disabled.
+
+    ``password_digest`` is what ``get_md5_hash_password`` gave for the user's
+    password when it was cached, for checking the token's revoke claim.
+    """
+    if settings.USER_CACHE_TTL <= 0:
+        return None
+    cached = _user_cache().get(user_cache_key(user_id))
+    if cached is None:
+        return None
+    db, values, password_digest = cached
+    model = get_user_model()
+    field_names = [f.attname for f in model._meta.concrete_fields if f.attname in values]
+    user = model.from_db(db, field_names, [values[name] for name in field_names])
+    return user, password_digest
+
+
+def cache_user(user):
+    """Store a resolved User, less its credentials, for ``USER_CACHE_TTL`` seconds"""
+    if settings.USER_CACHE_TTL <= 0:
+        return
+    values = {
+        f.attname: getattr(user, f.attname)
+        for f in user._meta.concrete_fields
+        if f.attname not in UNCACHED_USER_FIELDS
+    }
+    cached = (user._state.db, values, get_md5_hash_password(user.password))
+    _user_cache().set(user_cache_key(user.pk), cached, settings.USER_CACHE_TTL)
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop the cached User now and again once the surrounding transaction
+    commits, so a concurrent request cannot re-cache the pre-commit row.
+
+    ``QuerySet.update()`` does not send ``post_save``; callers that update
+    users in bulk must call this themselves.
+    """
+    invalidate_cached_users([user_id])
+
+
+def invalidate_cached_users(user_ids):
+    """:func:`invalidate_cached_user` for many users, in one cache call each time"""
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    _user_cache().delete_many(keys)
+    transaction.on_commit(lambda: _user_cache().delete_many(keys))
@@ -1,4 +1,7 @@
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
+from rest_framework.views import exception_handler
+from .renderers import ORJSONResponse
 
 def custom_response(data=None, message="Success", status="success", status_code=200):   
     """
@@ -37,17 +40,53 @@ def custom_error_response(message="Error", status="error", status_code=400):
         status=status_code
     )
 
+def custom_json_response(data=None, message="Success", status="success", status_code=200, headers=None):
+    """
+    ``custom_response`` for plain Django views that do not go through DRF's
+    renderers, such as the ASGI login view.
+
+    :return: An ORJSONResponse with the standardized structure.
+    """
+    return ORJSONResponse(
+        {
+            "status": status,
+            "message": message,
+            "data": data
+        },
+        status=status_code,
+        headers=headers
+    )
+
 def paginated_custom_response(paginator, page, data, message="Data retrieved successfully", status_code=200):
     """
     Standard paginated response.
+
+    Cursor paginators pass ``page=None``; they do not run a ``COUNT(*)`` so the
+    envelope omits ``count``.
     """
+    results = {
+        "next": paginator.get_next_link(),
+        "previous": paginator.get_previous_link(),
+        "results": data
+    }
+    if page is not None:
+        results = {"count": paginator.page.paginator.count, **results}
     return custom_response(
-        data={
-            "count": paginator.page.paginator.count,
-            "next": paginator.get_next_link(),
-            "previous": paginator.get_previous_link(),
-            "results": data
-        },
+        data=results,
         message=message,
         status_code=status_code
-    )
\ No newline at end of file
+    )
+
+def custom_exception_handler(exc, context):
+    """
+    DRF's exception handler, with throttled requests answered in the
+    standard envelope. DRF has already set ``Retry-After`` on the response.
+    """
+    response = exception_handler(exc, context)
+    if response is not None and isinstance(exc, Throttled):
+        response.data = {
+            "status": "error",
+            "message": "Too many requests, please try again later",
+            "data": None
+        }
+    return response
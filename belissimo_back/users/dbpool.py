@@ -0,0 +1,29 @@
+from django.db import connections
+
+
+def pool_stats(alias='default'):
+    """
+    Report connection reuse for a database alias in this process.
+
+    With ``DB_POOL`` enabled this is psycopg_pool's ``get_stats()`` (pool size,
+    available connections, waiting requests, cumulative wait time, ...) plus
+    the average wait per queued request. Without a pool it describes the
+    persistent-connection settings instead.
+    """
+    connection = connections[alias]
+    pool = getattr(connection, 'pool', None)
+    if pool is None:
+        conn_max_age = connection.settings_dict.get('CONN_MAX_AGE', 0)
+        return {
+            'mode': 'persistent' if conn_max_age else 'per_request',
+            'conn_max_age': conn_max_age,
+            'health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS', False),
+        }
+
+    stats = pool.get_stats()
+    queued = stats.get('requests_queued', 0)
+    return {
+        'mode': 'pool',
+        **stats,
+        'requests_wait_ms_avg': round(stats.get('requests_wait_ms', 0) / queued, 2) if queued else 0.0,
+    }
@@ -0,0 +1,154 @@
+import asyncio
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+
+from .metrics import LOGIN_HASH_PENDING
+
+
+class HashingOverloaded(Exception):
+    """
+    Raised when the login hashing queue is full and the attempt is shed, or
+    when a queued check does not finish within ``LOGIN_HASH_TIMEOUT``
+    """
+
+
+_executor = None
+_lock = threading.Lock()
+_pending = 0
+_completed = 0
+_rejected = 0
+_timed_out = 0
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            # spawn rather than fork: the parent runs an event loop and threads.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.LOGIN_HASH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _executor
+
+
+def _discard_executor(executor):
+    """Drop a pool whose worker died so the next login starts a fresh one"""
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _verify(password, encoded):
+    if encoded is None:
+        # Unknown user: hash anyway so response timing does not reveal it,
+        # mirroring ModelBackend.authenticate.
+        make_password(password)
+        return False
+    return check_password(password, encoded)
+
+
+def _release(future):
+    """Free the admission slot once the pool has actually finished the job"""
+    global _pending, _completed
+    LOGIN_HASH_PENDING.dec()
+    with _lock:
+        _pending -= 1
+        _completed += 1
+
+
+async def _run_in_pool(fn, *args):
+    """
+    Run ``fn(*args)`` in the hashing process pool.
+
+    At most ``LOGIN_HASH_MAX_PENDING`` jobs may be queued or running per
+    process; beyond that :class:`HashingOverloaded` is raised immediately
+    instead of letting the backlog grow. A slot is only released when the
+    pool finishes (or cancels) the job, so a caller giving up after
+    ``LOGIN_HASH_TIMEOUT`` does not free room for more work than the pool
+    can hold; the timeout is also reported as :class:`HashingOverloaded`.
+    """
+    global _pending, _rejected, _timed_out
+    with _lock:
+        if _pending >= settings.LOGIN_HASH_MAX_PENDING:
+            _rejected += 1
+            raise HashingOverloaded()
+        _pending += 1
+    LOGIN_HASH_PENDING.inc()
+
+    executor = _get_executor()
+    try:
+        future = executor.submit(fn, *args)
+    except BrokenProcessPool:
+        _release(None)
+        _discard_executor(executor)
+        raise
+    future.add_done_callback(_release)
+
+    try:
+        # On timeout the wrapper cancels the job if it has not started yet;
+        # a running job finishes in the pool and then releases its slot.
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=settings.LOGIN_HASH_TIMEOUT)
+    except asyncio.TimeoutError:
+        with _lock:
+            _timed_out += 1
+        raise HashingOverloaded()
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
+
+
+async def verify_password(password, encoded):
+    """
+    Check ``password`` against ``encoded`` in the hashing process pool,
+    subject to its admission limit (see :func:`_run_in_pool`). Pass
+    ``encoded=None`` for an unknown user to spend the same hashing time and
+    get ``False``.
+    """
+    return await _run_in_pool(_verify, password, encoded)
+
+
+async def hash_password(password):
+    """``make_password(password)`` in the hashing process pool"""
+    return await _run_in_pool(make_password, password)
+
+
+def password_needs_rehash(encoded):
+    """
+    True when ``encoded`` was made with another hasher than the preferred
+    one or with outdated parameters, the condition under which
+    ``User.check_password`` re-hashes and saves the password.
+    """
+    preferred = get_hasher('default')
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def hashing_stats():
+    """Queue depth and admission counters for this process's login hashing pool"""
+    with _lock:
+        return {
+            'workers': settings.LOGIN_HASH_WORKERS,
+            'max_pending': settings.LOGIN_HASH_MAX_PENDING,
+            'pending': _pending,
+            'completed': _completed,
+            'rejected': _rejected,
+            'timed_out': _timed_out,
+        }
+
+
+@atexit.register
+def _shutdown():
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,158 @@
+import csv
+import io
+import logging
+
+from django.db import IntegrityError, transaction
+
+from .metrics import EMAILS
+from .models import EmailOutbox, User, UserCredentialChallenge
+from .serializers import UNIQUE_FIELDS, UserImportSerializer, unique_error, unique_violation_errors
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on rows accepted in one upload.
+MAX_IMPORT_ROWS = 10000
+IMPORT_BATCH_SIZE = 500
+
+
+class ImportFileError(Exception):
+    """Raised when an upload cannot be read as a list of user rows"""
+
+
+def read_rows(request):
+    """
+    Extract import rows from a request: a CSV upload in ``file``, a JSON
+    array body, or a JSON object with a ``users`` array.
+    """
+    upload = request.FILES.get('file')
+    if upload is not None:
+        try:
+            text = io.TextIOWrapper(upload.file, encoding='utf-8-sig')
+            rows = [dict(row) for row in csv.DictReader(text)]
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ImportFileError(f"Could not read CSV file: {e}")
+    else:
+        rows = request.data.get('users') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list):
+            raise ImportFileError("Expected a CSV 'file' upload or a JSON array of users")
+
+    if not rows:
+        raise ImportFileError("No rows to import")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise ImportFileError(f"At most {MAX_IMPORT_ROWS} rows can be imported at once")
+    return rows
+
+
+def _existing_values(field, values):
+    """Values of ``field`` that are already taken, in one query per chunk"""
+    values = list(values)
+    taken = set()
+    for start in range(0, len(values), IMPORT_BATCH_SIZE):
+        chunk = values[start:start + IMPORT_BATCH_SIZE]
+        taken.update(
+            User.objects.filter(**{f'{field}__in': chunk}).values_list(field, flat=True)
+        )
+    return taken
+
+
+def _find_conflicts(valid_rows):
+    """Map row number to uniqueness errors, against the database and earlier rows"""
+    conflicts = {}
+    for field in UNIQUE_FIELDS:
+        taken = _existing_values(field, {data[field] for _, data in valid_rows if data.get(field)})
+        seen = set()
+        for index, data in valid_rows:
+            value = data.get(field)
+            if not value:
+                continue
+            if value in taken:
+                conflicts.setdefault(index, {})[field] = [unique_error(field)]
+            elif value in seen:
+                conflicts.setdefault(index, {})[field] = [f"Duplicate {field.replace('_', ' ')} in this import."]
+            seen.add(value)
+    return conflicts
+
+
+def _create_batch(batch, created_by):
+    """
+    Insert the users of ``batch``, their password reset tokens and queued
+    invite emails in one transaction; returns the created users in order.
+    """
+    users, challenges, emails = [], [], []
+    for index, data in batch:
+        user = User(created_by=created_by, **data)
+        challenge = UserCredentialChallenge(user=user)
+        reset_token = challenge.assign_password_reset_token()
+        users.append(user)
+        challenges.append(challenge)
+        emails.append(EmailOutbox(
+            kind=EmailOutbox.KIND_PASSWORD_RESET,
+            to_email=user.email_address,
+            context={'name': user.full_name, 'reset_token': reset_token},
+        ))
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        UserCredentialChallenge.objects.bulk_create(challenges)
+        EmailOutbox.objects.bulk_create(emails)
+        count = len(emails)
+        transaction.on_commit(lambda: EMAILS.labels(EmailOutbox.KIND_PASSWORD_RESET, 'queued').inc(count))
+    return users
+
+
+def import_users(rows, created_by, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Validate and create landlords/tenants in bulk.
+
+    Every row is validated with the registration rules, uniqueness is
+    checked with one ``IN`` query per unique field, and accepted rows are
+    inserted ``batch_size`` at a time with ``bulk_create`` together with
+    their password reset tokens and queued invite emails. A batch that
+    still hits a unique constraint (a concurrent signup) is retried row by
+    row, so only the conflicting rows fail. Returns one result per input
+    row, in input order.
+    """
+    results = {}
+    valid_rows = []
+    for index, row in enumerate(rows, start=1):
+        serializer = UserImportSerializer(data=row)
+        if serializer.is_valid():
+            data = dict(serializer.validated_data)
+            data['email_address'] = User.objects.normalize_email(data['email_address'])
+            valid_rows.append((index, data))
+        else:
+            results[index] = {'row': index, 'status': 'error', 'errors': serializer.errors}
+
+    conflicts = _find_conflicts(valid_rows)
+    accepted = []
+    for index, data in valid_rows:
+        if index in conflicts:
+            results[index] = {'row': index, 'status': 'error', 'errors': conflicts[index]}
+        else:
+            accepted.append((index, data))
+
+    for start in range(0, len(accepted), batch_size):
+        batch = accepted[start:start + batch_size]
+        try:
+            created = list(zip(batch, _create_batch(batch, created_by)))
+        except IntegrityError:
+            created = []
+            for item in batch:
+                index, data = item
+                try:
+                    created.extend(zip([item], _create_batch([item], created_by)))
+                except IntegrityError as e:
+                    logger.warning("Import row %d rejected: %s", index, e)
+                    results[index] = {
+                        'row': index, 'status': 'error',
+                        'email_address': data['email_address'],
+                        'errors': unique_violation_errors(e) or {
+                            'non_field_errors': ["This user could not be created."]
+                        },
+                    }
+        for (index, data), user in created:
+            results[index] = {
+                'row': index, 'status': 'created',
+                'id': str(user.id), 'email_address': user.email_address,
+            }
+
+    return [results[index] for index in sorted(results)]
@@ -0,0 +1,258 @@
+import atexit
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection as thread_connection, connections, router
+from django.db.models import Case, DateTimeField, F, Q, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .cache import invalidate_cached_users
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE statement when flushing.
+FLUSH_CHUNK_SIZE = 500
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def write_last_logins(pending):
+    """
+    Apply ``{user_id: last_login}`` in bulk, never moving a timestamp backwards.
+
+    PostgreSQL gets one ``UPDATE ... FROM (VALUES ...)`` per chunk; other
+    backends fall back to a ``CASE`` update. The users' cached principals
+    are dropped afterwards.
+    """
+    items = list(pending.items())
+    if not items:
+        return
+    connection = connections[router.db_for_write(User)]
+    for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+        chunk = items[start:start + FLUSH_CHUNK_SIZE]
+        if connection.vendor == 'postgresql':
+            _write_chunk_postgresql(connection, chunk)
+        else:
+            User.objects.filter(pk__in=[user_id for user_id, _ in chunk]).update(
+                last_login=Case(
+                    *[
+                        When(
+                            Q(last_login__isnull=True) | Q(last_login__lt=when),
+                            pk=user_id, then=Value(when),
+                        )
+                        for user_id, when in chunk
+                    ],
+                    default=F('last_login'),
+                    output_field=DateTimeField(),
+                )
+            )
+        invalidate_cached_users([user_id for user_id, _ in chunk])
+
+
+def _write_chunk_postgresql(connection, chunk):
+    qn = connection.ops.quote_name
+    table = qn(User._meta.db_table)
+    pk = qn(User._meta.pk.column)
+    last_login = qn(User._meta.get_field('last_login').column)
+    values = ', '.join(['(%s::uuid, %s::timestamptz)'] * len(chunk))
+    params = []
+    for user_id, when in chunk:
+        params.extend([str(user_id), when])
+    sql = (
+        f'UPDATE {table} AS u SET {last_login} = v.last_login '
+        f'FROM (VALUES {values}) AS v(id, last_login) '
+        f'WHERE u.{pk} = v.id AND (u.{last_login} IS NULL OR u.{last_login} < v.last_login)'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+class LocalBackend:
+    """Pending ``last_login`` values in this process's memory"""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def record(self, user_id, when):
+        with self._lock:
+            previous = self._pending.get(user_id)
+            if previous is None or when > previous:
+                self._pending[user_id] = when
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def acknowledge(self, flushed):
+        """Forget the flushed values, keeping any newer login recorded since"""
+        with self._lock:
+            for user_id, when in flushed.items():
+                if self._pending.get(user_id) == when:
+                    del self._pending[user_id]
+
+
+class RedisBackend:
+    """
+    Pending ``last_login`` values in one Redis hash shared by every worker,
+    as microseconds since the epoch, so a buffered login survives the worker
+    that recorded it being killed or recycled. Recording keeps the later
+    timestamp and acknowledging only removes values that were not replaced
+    in the meantime, each as one Lua script.
+    """
+
+    KEY = 'users:last_login:pending'
+
+    RECORD_SCRIPT = """
+    local current = redis.call('HGET', KEYS[1], ARGV[1])
+    if not current or tonumber(current) < tonumber(ARGV[2]) then
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    end
+    """
+
+    ACKNOWLEDGE_SCRIPT = """
+    for i = 1, #ARGV, 2 do
+        if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+            redis.call('HDEL', KEYS[1], ARGV[i])
+        end
+    end
+    """
+
+    def __init__(self, url=None):
+        import redis
+
+        self.client = redis.Redis.from_url(url or settings.LAST_LOGIN_REDIS_URL)
+        self.record_script = self.client.register_script(self.RECORD_SCRIPT)
+        self.acknowledge_script = self.client.register_script(self.ACKNOWLEDGE_SCRIPT)
+
+    @staticmethod
+    def encode(when):
+        return str((when - EPOCH) // timedelta(microseconds=1))
+
+    @staticmethod
+    def decode(value):
+        return EPOCH + timedelta(microseconds=int(value))
+
+    def record(self, user_id, when):
+        self.record_script(keys=[self.KEY], args=[str(user_id), self.encode(when)])
+
+    def pending(self):
+        return {
+            uuid.UUID(user_id.decode()): self.decode(value)
+            for user_id, value in self.client.hgetall(self.KEY).items()
+        }
+
+    def acknowledge(self, flushed):
+        args = []
+        for user_id, when in flushed.items():
+            args.extend([str(user_id), self.encode(when)])
+        if args:
+            self.acknowledge_script(keys=[self.KEY], args=args)
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for ``last_login``.
+
+    Logins only record ``{user_id: timestamp}`` in the backend (repeat
+    logins coalesce to the latest one); a daemon thread flushes it every
+    ``LAST_LOGIN_FLUSH_INTERVAL`` seconds and ``atexit`` flushes once more
+    when the worker shuts down. With the Redis backend the buffer is shared,
+    so any worker's flush writes every worker's logins; values are removed
+    from the buffer only after they are written.
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stopped = threading.Event()
+
+    @property
+    def backend(self):
+        with self._lock:
+            if self._backend is None:
+                self._backend = import_string(settings.LAST_LOGIN_BACKEND)()
+            return self._backend
+
+    def record(self, user_id, when):
+        self.backend.record(user_id, when)
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._run, name='last-login-flusher', daemon=True
+                )
+                self._flusher.start()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of users flushed"""
+        try:
+            pending = self.backend.pending()
+        except Exception:
+            logger.exception("Failed to read buffered last_login updates")
+            return 0
+        if not pending:
+            return 0
+        try:
+            write_last_logins(pending)
+        except Exception:
+            # Still buffered; the next flush retries them.
+            logger.exception("Failed to flush %d last_login updates", len(pending))
+            return 0
+        try:
+            self.backend.acknowledge(pending)
+        except Exception:
+            # Left buffered and written again next time, which is harmless.
+            logger.exception("Failed to clear %d flushed last_login updates", len(pending))
+        return len(pending)
+
+    def _run(self):
+        while not self._stopped.wait(settings.LAST_LOGIN_FLUSH_INTERVAL):
+            try:
+                self.flush()
+            finally:
+                # This thread's connection is idle until the next interval.
+                thread_connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
+
+
+_buffer = LastLoginBuffer()
+atexit.register(_buffer.stop)
+
+
+def record_login(user, when=None):
+    """Set ``user.last_login`` and persist it now or through the write-behind buffer"""
+    user.last_login = when or timezone.now()
+    if settings.LAST_LOGIN_WRITE_BEHIND:
+        try:
+            _buffer.record(user.pk, user.last_login)
+            return
+        except Exception:
+            logger.exception("last_login buffer unavailable, writing it directly")
+    user.save(update_fields=['last_login'])
+
+
+async def arecord_login(user, when=None):
+    """Async variant of :func:`record_login` for the ASGI views"""
+    user.last_login = when or timezone.now()
+    if settings.LAST_LOGIN_WRITE_BEHIND:
+        try:
+            await sync_to_async(_buffer.record, thread_sensitive=False)(user.pk, user.last_login)
+            return
+        except Exception:
+            logger.exception("last_login buffer unavailable, writing it directly")
+    await user.asave(update_fields=['last_login'])
+
+
+def flush_last_logins():
+    """Flush the buffered ``last_login`` updates immediately"""
+    return _buffer.flush()
@@ -0,0 +1,128 @@
+import atexit
+import copy
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from .metrics import LOG_RECORDS_DROPPED
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message, any
+    ``extra`` fields and the formatted exception, if there is one.
+    """
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        if record.stack_info:
+            payload['stack'] = self.formatStack(record.stack_info)
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of the records below ERROR from high-volume loggers.
+
+    ``rates`` maps a logger name (or parent, e.g. ``users``) to the fraction
+    of records to keep. Kept records carry ``sample_rate`` so counts can be
+    scaled back up.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = {name: float(rate) for name, rate in (rates or {}).items()}
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        if rate is None or rate >= 1:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return None
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Hand records to a background thread that formats and writes them, so
+    logging never blocks the request thread on file or stream I/O.
+
+    Writes go to ``filename`` when given, otherwise to stderr. When the
+    bounded queue is full new records are dropped rather than waited on and
+    counted in ``bellissimo_log_records_dropped_total``. Each process starts
+    its own listener when logging is configured (with gunicorn, that is in
+    each worker unless ``preload_app`` is used).
+    """
+
+    def __init__(self, filename=None, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        if filename:
+            self.target = logging.FileHandler(filename, encoding='utf-8')
+        else:
+            self.target = logging.StreamHandler(sys.stderr)
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread, in the target handler.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Snapshot what cannot safely be deferred: the interpolated message
+        (arguments may change after the call) and the exception text.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            self.target.close()
+        super().close()
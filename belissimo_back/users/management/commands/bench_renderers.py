@@ -0,0 +1,78 @@
+import io
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from users.models import User
+from users.renderers import ORJSONParser, ORJSONRenderer
+from users.serializers import UserListSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSONRenderer/JSONParser with the orjson ones on a list_users payload."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500,
+                            help='Users in the payload (default: 500, the largest list_users page).')
+        parser.add_argument('--repeat', type=int, default=200,
+                            help='Timed iterations per candidate (default: 200).')
+
+    def handle(self, *args, **options):
+        payload = self.build_payload(options['rows'])
+        self.stdout.write(f"Payload: {options['rows']} users, {len(JSONRenderer().render(payload))} bytes")
+
+        renderers = [('JSONRenderer', JSONRenderer()), ('ORJSONRenderer', ORJSONRenderer())]
+        baseline = None
+        for name, renderer in renderers:
+            elapsed = self.time(lambda: renderer.render(payload, 'application/json'), options['repeat'])
+            baseline = baseline or elapsed
+            self.report(f"render {name}", elapsed, baseline)
+
+        body = ORJSONRenderer().render(payload)
+        parsers = [('JSONParser', JSONParser()), ('ORJSONParser', ORJSONParser())]
+        baseline = None
+        for name, parser in parsers:
+            elapsed = self.time(lambda: parser.parse(io.BytesIO(body), 'application/json'), options['repeat'])
+            baseline = baseline or elapsed
+            self.report(f"parse {name}", elapsed, baseline)
+
+    def build_payload(self, rows):
+        """The paginated envelope returned by list_users, built from unsaved users"""
+        now = timezone.now()
+        users = [
+            User(
+                id=uuid.uuid4(),
+                firstname=f'First{i}',
+                lastname=f'Last{i}',
+                email_address=f'user{i}@example.com',
+                mobile_number=f'07{i:08d}',
+                role='tenant' if i % 3 else 'landlord',
+                identification_number=f'ID{i:08d}',
+                created_at=now - timedelta(minutes=i),
+            )
+            for i in range(rows)
+        ]
+        return {
+            'status': 'success',
+            'message': 'Data retrieved successfully',
+            'data': {
+                'next': 'http://testserver/api/users/list-users/?cursor=eyJwIjpbXX0',
+                'previous': None,
+                'results': UserListSerializer(users, many=True).data,
+            },
+        }
+
+    def time(self, func, repeat):
+        func()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat
+
+    def report(self, label, elapsed, baseline):
+        self.stdout.write(f"{label:<22} {elapsed * 1000:8.3f} ms/op  {baseline / elapsed:5.1f}x")
@@ -0,0 +1,101 @@
+import json
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.benchmark import build_scenarios, check_budgets, isolated_database, run_scenario, seed_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the users API in-process against a throwaway test database: "
+        "p50/p99 latency, throughput and queries per call for login, profile, "
+        "list_users, register and reset_password. Exits non-zero when a budget "
+        "or baseline regression check fails."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000,
+                            help='Users seeded before measuring (default: 1000).')
+        parser.add_argument('--iterations', type=int, default=200,
+                            help='Timed calls per scenario (default: 200).')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Untimed calls per scenario first (default: 5).')
+        parser.add_argument('--scenarios', default='',
+                            help='Comma-separated scenario names to run (default: all).')
+        parser.add_argument('--fast-hasher', action='store_true',
+                            help='Use MD5 password hashing to measure app overhead without hashing cost.')
+        parser.add_argument('--budget',
+                            help='JSON file of per-scenario limits, e.g. {"login": {"p99_ms": 400, "queries": 4}}.')
+        parser.add_argument('--baseline',
+                            help='JSON results of an earlier run to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed latency/throughput regression against --baseline (default: 0.2).')
+        parser.add_argument('--save',
+                            help='Write this run\'s results as JSON (usable as a later --baseline).')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database between runs.')
+
+    def handle(self, *args, **options):
+        budget = self.load_json(options['budget'])
+        baseline = self.load_json(options['baseline'])
+        if baseline:
+            baseline = baseline.get('scenarios', baseline)
+
+        overrides = {}
+        if options['fast_hasher']:
+            overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+        with isolated_database(keepdb=options['keepdb'], **overrides):
+            results = self.run(options)
+
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump({
+                    'engine': settings.DATABASES['default']['ENGINE'],
+                    'users': options['users'],
+                    'iterations': options['iterations'],
+                    'scenarios': results,
+                }, f, indent=2)
+            self.stdout.write(f"Results saved to {options['save']}")
+
+        violations = check_budgets(results, budget, baseline, options['tolerance'])
+        if violations:
+            for violation in violations:
+                self.stderr.write(violation)
+            raise CommandError(f"{len(violations)} benchmark budget violation(s)")
+
+    def run(self, options):
+        admin, member = seed_users(options['users'])
+        scenarios = build_scenarios(admin, member, run_id=uuid.uuid4().hex[:8])
+        selected = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(scenarios)}")
+
+        self.stdout.write(
+            f"{settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1]}, "
+            f"{options['users']} users, {options['iterations']} calls per scenario"
+        )
+        self.stdout.write(f"{'scenario':<22}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'queries':>9}")
+        results = {}
+        for name, scenario in scenarios.items():
+            if selected and name not in selected:
+                continue
+            result = run_scenario(scenario, options['iterations'], options['warmup'])
+            results[name] = result
+            self.stdout.write(
+                f"{name:<22}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['rps']:>10.1f}{result['queries']:>9}"
+            )
+        return results
+
+    def load_json(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {path}: {e}")
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.benchmark import isolated_database, seed_users
+from users.budgets import ACTION_BUDGETS, build_cases, check_case
+
+
+class Command(BaseCommand):
+    help = (
+        "Run one request per UserViewSet action against a throwaway test "
+        "database and fail when an action exceeds its query or memory budget "
+        "(users.budgets.ACTION_BUDGETS), printing the SQL it ran."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200,
+                            help='Users seeded before measuring (default: 200).')
+        parser.add_argument('--actions', default='',
+                            help='Comma-separated actions to check (default: all).')
+        parser.add_argument('--show-sql', action='store_true',
+                            help='Print the SQL of every action, not only the failing ones.')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database between runs.')
+
+    def handle(self, *args, **options):
+        selected = [name.strip() for name in options['actions'].split(',') if name.strip()]
+        unknown = set(selected) - set(ACTION_BUDGETS)
+        if unknown:
+            raise CommandError(
+                f"Unknown action(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(ACTION_BUDGETS)}"
+            )
+
+        with isolated_database(keepdb=options['keepdb']):
+            admin, member = seed_users(options['users'])
+            cases = build_cases(admin, member)
+            missing = set(ACTION_BUDGETS) - set(cases)
+            if missing:
+                raise CommandError(f"No request defined for action(s): {', '.join(sorted(missing))}")
+
+            self.stdout.write(f"{'action':<30}{'queries':>12}{'memory KiB':>20}")
+            failures = []
+            for action, budget in ACTION_BUDGETS.items():
+                if selected and action not in selected:
+                    continue
+                measured = check_case(cases[action], budget)
+                status = 'FAIL' if measured.violations() else 'ok'
+                self.stdout.write(
+                    f"{action:<30}{measured.query_count:>6} / {budget['queries']:<3}"
+                    f"{measured.peak_kb:>12} / {budget['memory_kb']:<6}{status}"
+                )
+                if measured.violations():
+                    failures.append(measured)
+                elif options['show_sql']:
+                    self.stdout.write(measured.report())
+
+        for measured in failures:
+            self.stderr.write(measured.report())
+        if failures:
+            raise CommandError(f"{len(failures)} action(s) over budget")
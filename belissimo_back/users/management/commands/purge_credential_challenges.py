@@ -0,0 +1,92 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.utils import timezone
+
+from users.models import UserCredentialChallenge
+
+
+class Command(BaseCommand):
+    help = (
+        "Clear expired verification codes and reset tokens, lift elapsed reset "
+        "blocks and delete empty challenge rows in small, throttled batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows changed per statement (default: 1000).')
+        parser.add_argument('--sleep', type=float, default=0.1,
+                            help='Seconds to pause between batches (default: 0.1).')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop each pass after this many batches (default: no limit).')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        Challenge = UserCredentialChallenge
+        passes = [
+            (
+                'expired verification codes',
+                Challenge.objects.filter(verification_code_expires_at__lt=now),
+                {'verification_code': None, 'verification_code_expires_at': None},
+            ),
+            (
+                'expired reset tokens',
+                Challenge.objects.filter(password_reset_expires_at__lt=now),
+                {'password_reset_token': None, 'password_reset_expires_at': None},
+            ),
+            (
+                'elapsed reset blocks',
+                Challenge.objects.filter(password_reset_blocked_until__lte=now),
+                {'password_reset_blocked_until': None, 'password_reset_attempts': 0},
+            ),
+            (
+                'empty challenges',
+                Challenge.objects.filter(
+                    verification_code__isnull=True,
+                    password_reset_token__isnull=True,
+                    password_reset_blocked_until__isnull=True,
+                    password_reset_attempts=0,
+                ),
+                None,
+            ),
+        ]
+
+        total = 0
+        started = time.monotonic()
+        for label, stale, values in passes:
+            count, elapsed = self.purge(stale, values, options)
+            total += count
+            self.stdout.write(f"Purged {count} {label} in {elapsed:.2f}s ({self.rate(count, elapsed)} rows/s)")
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"Done: {total} rows in {elapsed:.2f}s ({self.rate(total, elapsed)} rows/s)")
+
+    def purge(self, stale, values, options):
+        """
+        Apply one pass as ``UPDATE ... WHERE pk IN (SELECT pk ... LIMIT n)``
+        (or the matching DELETE) until no stale rows remain.
+
+        Each batch is its own short transaction, and the inner SELECT skips
+        rows a live request has locked instead of waiting on them.
+        """
+        count = batches = 0
+        started = time.monotonic()
+        while options['max_batches'] is None or batches < options['max_batches']:
+            with transaction.atomic():
+                batch = stale.select_for_update(skip_locked=True).values('pk')[:options['batch_size']]
+                target = stale.filter(pk__in=models.Subquery(batch))
+                if values is None:
+                    changed, _ = target.delete()
+                else:
+                    changed = target.update(**values)
+            count += changed
+            batches += 1
+            if changed < options['batch_size']:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        return count, time.monotonic() - started
+
+    @staticmethod
+    def rate(count, elapsed):
+        return int(count / elapsed) if elapsed > 0 else count
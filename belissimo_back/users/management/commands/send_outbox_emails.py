@@ -0,0 +1,110 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.metrics import EMAILS
+from users.models import EmailOutbox
+from users.utils import build_outbox_message
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox emails in batches over a single SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Rows claimed per transaction (default: 50).')
+        parser.add_argument('--max-attempts', type=int, default=5,
+                            help='Attempts before an entry is marked failed (default: 5).')
+        parser.add_argument('--backoff', type=int, default=30,
+                            help='Base retry delay in seconds, doubled per attempt (default: 30).')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for new entries instead of exiting when drained.')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to sleep between polls with --loop (default: 5).')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = self.drain(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+                backoff=options['backoff'],
+            )
+            if sent or failed or not options['loop']:
+                self.stdout.write(f"Outbox drained: {sent} sent, {failed} failed")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size, max_attempts, backoff):
+        """Send every due entry, reusing one SMTP connection for the whole run"""
+        connection = get_connection()
+        sent = failed = 0
+        try:
+            while True:
+                with transaction.atomic():
+                    batch = list(
+                        EmailOutbox.objects
+                        .select_for_update(skip_locked=True)
+                        .filter(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=timezone.now())
+                        .order_by('next_attempt_at', 'id')[:batch_size]
+                    )
+                    if not batch:
+                        return sent, failed
+
+                    for entry in batch:
+                        if self.deliver(entry, connection, max_attempts, backoff):
+                            sent += 1
+                        elif entry.status == EmailOutbox.STATUS_FAILED:
+                            failed += 1
+
+                    EmailOutbox.objects.bulk_update(
+                        batch,
+                        ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'context'],
+                    )
+        finally:
+            connection.close()
+
+    def deliver(self, entry, connection, max_attempts, backoff):
+        now = timezone.now()
+        entry.attempts += 1
+        try:
+            message = build_outbox_message(entry)
+            message.connection = connection
+            message.send()
+        except Exception as e:
+            # Drop a possibly broken SMTP session; the next send reopens it.
+            connection.close()
+            entry.last_error = str(e)
+            if entry.attempts >= max_attempts:
+                entry.status = EmailOutbox.STATUS_FAILED
+                # A failed entry is never retried, so drop its code or token too.
+                entry.context = {}
+                EMAILS.labels(entry.kind, 'failed').inc()
+                logger.error(
+                    "Giving up on %s email to %s: %s", entry.kind, entry.to_email, e,
+                    exc_info=True,
+                    extra={'outbox_id': entry.pk, 'attempts': entry.attempts, 'email_kind': entry.kind},
+                )
+            else:
+                entry.next_attempt_at = now + timedelta(seconds=backoff * 2 ** (entry.attempts - 1))
+                EMAILS.labels(entry.kind, 'retry').inc()
+                logger.warning(
+                    "Retrying %s email to %s later: %s", entry.kind, entry.to_email, e,
+                    extra={'outbox_id': entry.pk, 'attempts': entry.attempts, 'email_kind': entry.kind},
+                )
+            return False
+
+        entry.status = EmailOutbox.STATUS_SENT
+        EMAILS.labels(entry.kind, 'sent').inc()
+        entry.sent_at = now
+        entry.last_error = ''
+        # Codes and reset tokens are not needed once delivered.
+        entry.context = {}
+        return True
@@ -0,0 +1,105 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .dbpool import pool_stats
+
+REQUESTS = Counter(
+    'bellissimo_requests_total',
+    'Requests handled, by view action and HTTP status.',
+    ['action', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'bellissimo_request_duration_seconds',
+    'Request latency by view action.',
+    ['action'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_QUERIES = Histogram(
+    'bellissimo_request_db_queries',
+    'Database queries per request by view action.',
+    ['action'],
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128),
+)
+EMAILS = Counter(
+    'bellissimo_emails_total',
+    'Account emails by kind and result (queued, sent, retry, failed).',
+    ['kind', 'result'],
+)
+RATE_LIMITED = Counter(
+    'bellissimo_rate_limit_rejections_total',
+    'Requests rejected by the authentication rate limits.',
+    ['scope', 'key'],
+)
+LOG_RECORDS_DROPPED = Counter(
+    'bellissimo_log_records_dropped_total',
+    'Log records dropped because the logging queue was full.',
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'bellissimo_db_pool_connections',
+    'Database pool connections by state, summed over live workers.',
+    ['alias', 'state'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_WAITING = Gauge(
+    'bellissimo_db_pool_requests_waiting',
+    'Requests waiting for a pooled database connection, summed over live workers.',
+    ['alias'],
+    multiprocess_mode='livesum',
+)
+LOGIN_HASH_PENDING = Gauge(
+    'bellissimo_login_hash_pending',
+    'Login password checks queued or running in the hashing pool.',
+    multiprocess_mode='livesum',
+)
+
+
+def observe_request(profile, status_code):
+    """Record a finished request profile (called by RequestTimingMiddleware)"""
+    action = profile.action or 'unmatched'
+    REQUESTS.labels(action, str(status_code)).inc()
+    REQUEST_LATENCY.labels(action).observe(profile.total)
+    REQUEST_QUERIES.labels(action).observe(profile.query_count)
+
+
+def observe_db_pool(alias='default'):
+    """Publish this worker's pool usage; a no-op without DB_POOL"""
+    stats = pool_stats(alias)
+    if stats['mode'] != 'pool':
+        return
+    DB_POOL_CONNECTIONS.labels(alias, 'open').set(stats.get('pool_size', 0))
+    DB_POOL_CONNECTIONS.labels(alias, 'idle').set(stats.get('pool_available', 0))
+    DB_POOL_WAITING.labels(alias).set(stats.get('requests_waiting', 0))
+
+
+def get_registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus text exposition, optionally guarded by ``METRICS_AUTH_TOKEN``"""
+    token = settings.METRICS_AUTH_TOKEN
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return HttpResponse(status=401)
+    observe_db_pool()
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,90 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, perf
+
+logger = logging.getLogger('users.perf')
+
+
+class RequestTimingMiddleware:
+    """
+    Profile every request: DB query count and time, serializer and email
+    time, and total latency, labelled with the ``UserViewSet`` action.
+
+    The timings are returned in a ``Server-Timing`` header (when
+    ``PERF_SERVER_TIMING`` is on), and requests slower than
+    ``PERF_SLOW_REQUEST_MS`` are logged with their most expensive queries.
+    Every profile also feeds the Prometheus request metrics.
+    Works under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile, token = perf.begin(request.method, request.path)
+        request.profile = profile
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.end(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile, token = perf.begin(request.method, request.path)
+        request.profile = profile
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.end(token)
+        return self.finish(request, response, profile)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            profile.action = view_label(request, view_func)
+
+    def finish(self, request, response, profile):
+        total_ms = profile.finish() * 1000
+        metrics.observe_request(profile, response.status_code)
+        metrics.observe_db_pool()
+        if settings.PERF_SERVER_TIMING:
+            response['Server-Timing'] = server_timing(profile)
+        if total_ms >= settings.PERF_SLOW_REQUEST_MS:
+            record = profile.as_dict(settings.PERF_TOP_QUERIES)
+            record['status'] = response.status_code
+            logger.warning(
+                "Slow request %s %s (%.0f ms)", request.method, request.path, total_ms,
+                extra={'request_profile': record},
+            )
+        return response
+
+
+def view_label(request, view_func):
+    """``UserViewSet.login`` for viewset actions, otherwise the view's name"""
+    cls = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None)
+    if cls is not None and actions:
+        return f"{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+    if cls is not None:
+        return cls.__name__
+    return getattr(view_func, '__name__', repr(view_func))
+
+
+def server_timing(profile):
+    parts = []
+    for name, value in profile.timings().items():
+        part = f'{name};dur={value:.1f}'
+        if name == 'db':
+            part += f';desc="{profile.query_count} queries"'
+        parts.append(part)
+    return ', '.join(parts)
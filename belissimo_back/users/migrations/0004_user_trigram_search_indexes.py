@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:30
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+import users.operations
+
+
+def trigram_index(name, column):
+    # Same expression icontains compiles to on PostgreSQL: UPPER(col::text) LIKE UPPER(%s)
+    return users.operations.PostgresRunSQL(
+        sql=f'CREATE INDEX IF NOT EXISTS "{name}" ON "users" USING gin ((UPPER("{column}"::text)) gin_trgm_ops);',
+        reverse_sql=f'DROP INDEX IF EXISTS "{name}";',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_user_created_at_id_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        trigram_index('users_firstname_trgm_idx', 'firstname'),
+        trigram_index('users_lastname_trgm_idx', 'lastname'),
+        trigram_index('users_mobile_number_trgm_idx', 'mobile_number'),
+    ]
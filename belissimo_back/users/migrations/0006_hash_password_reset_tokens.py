@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:33
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    """Replace outstanding raw reset tokens with their SHA-256 digest so they keep working"""
+    User = apps.get_model('users', 'User')
+    users = list(User.objects.filter(password_reset_token__isnull=False).only('pk', 'password_reset_token'))
+    for user in users:
+        user.password_reset_token = hashlib.sha256(user.password_reset_token.encode()).hexdigest()
+    User.objects.bulk_update(users, ['password_reset_token'], batch_size=500)
+
+
+def clear_hashed_tokens(apps, schema_editor):
+    """Digests cannot be turned back into tokens; outstanding resets must be requested again"""
+    User = apps.get_model('users', 'User')
+    User.objects.filter(password_reset_token__isnull=False).update(
+        password_reset_token=None, password_reset_expires_at=None
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0005_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_existing_tokens, clear_hashed_tokens),
+        migrations.AlterField(
+            model_name='user',
+            name='password_reset_token',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(condition=models.Q(('password_reset_token__isnull', False)), fields=('password_reset_token',), name='users_password_reset_token_uniq'),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+CHALLENGE_FIELDS = [
+    'verification_code',
+    'verification_code_expires_at',
+    'password_reset_token',
+    'password_reset_expires_at',
+    'password_reset_attempts',
+    'password_reset_blocked_until',
+]
+
+
+def copy_challenges_out(apps, schema_editor):
+    """Move outstanding codes, tokens and reset counters into the new table"""
+    User = apps.get_model('users', 'User')
+    UserCredentialChallenge = apps.get_model('users', 'UserCredentialChallenge')
+    users = User.objects.filter(
+        models.Q(verification_code__isnull=False) |
+        models.Q(password_reset_token__isnull=False) |
+        models.Q(password_reset_attempts__gt=0) |
+        models.Q(password_reset_blocked_until__isnull=False)
+    ).values('pk', *CHALLENGE_FIELDS)
+    challenges = (
+        UserCredentialChallenge(user_id=row.pop('pk'), **row)
+        for row in users.iterator(chunk_size=2000)
+    )
+    UserCredentialChallenge.objects.bulk_create(challenges, batch_size=500)
+
+
+def copy_challenges_back(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    UserCredentialChallenge = apps.get_model('users', 'UserCredentialChallenge')
+    users = []
+    for challenge in UserCredentialChallenge.objects.iterator(chunk_size=2000):
+        user = User(pk=challenge.user_id)
+        for field in CHALLENGE_FIELDS:
+            setattr(user, field, getattr(challenge, field))
+        users.append(user)
+    User.objects.bulk_update(users, CHALLENGE_FIELDS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_hash_password_reset_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCredentialChallenge',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='credential_challenge', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('verification_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('verification_code_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('password_reset_token', models.CharField(blank=True, max_length=64, null=True)),
+                ('password_reset_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('password_reset_attempts', models.PositiveIntegerField(default=0)),
+                ('password_reset_blocked_until', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Credential Challenge',
+                'verbose_name_plural': 'Credential Challenges',
+                'db_table': 'user_credential_challenges',
+            },
+        ),
+        # Before the copy: PostgreSQL refuses CREATE INDEX on a table with
+        # pending (deferred FK) trigger events from rows inserted in the
+        # same transaction.
+        migrations.AddConstraint(
+            model_name='usercredentialchallenge',
+            constraint=models.UniqueConstraint(condition=models.Q(('password_reset_token__isnull', False)), fields=('password_reset_token',), name='challenges_reset_token_uniq'),
+        ),
+        migrations.RunPython(copy_challenges_out, copy_challenges_back),
+        migrations.RemoveConstraint(
+            model_name='user',
+            name='users_password_reset_token_uniq',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='password_reset_attempts',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='password_reset_blocked_until',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='password_reset_expires_at',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='password_reset_token',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='verification_code',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='verification_code_expires_at',
+        ),
+    ]
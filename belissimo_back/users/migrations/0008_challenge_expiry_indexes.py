@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_credential_challenge'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usercredentialchallenge',
+            index=models.Index(condition=models.Q(('verification_code_expires_at__isnull', False)), fields=['verification_code_expires_at'], name='challenges_code_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usercredentialchallenge',
+            index=models.Index(condition=models.Q(('password_reset_expires_at__isnull', False)), fields=['password_reset_expires_at'], name='challenges_reset_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usercredentialchallenge',
+            index=models.Index(condition=models.Q(('password_reset_blocked_until__isnull', False)), fields=['password_reset_blocked_until'], name='challenges_blocked_until_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:10
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def lowercase_email_addresses(apps, schema_editor):
+    """
+    Store every address lowercased, as CustomUserManager.normalize_email now
+    does, in one UPDATE.
+
+    Accounts whose addresses only differ by case could no longer sign in
+    once lookups are lowercased, and the unique index on
+    ``LOWER(email_address)`` added next cannot be built while they exist, so
+    the migration stops and lists them; merge or rename them, then migrate
+    again.
+    """
+    User = apps.get_model('users', 'User')
+    twins = (
+        User.objects.annotate(lowered=Lower('email_address'))
+        .values('lowered')
+        .annotate(accounts=Count('pk'))
+        .filter(accounts__gt=1)
+        .values('lowered')
+    )
+    clashing = list(
+        User.objects.annotate(lowered=Lower('email_address'))
+        .filter(lowered__in=twins)
+        .order_by('lowered', 'email_address')
+        .values_list('email_address', flat=True)
+    )
+    if clashing:
+        raise RuntimeError(
+            f"{len(clashing)} accounts have addresses that only differ by case: {', '.join(clashing)}. "
+            "Merge or rename them, then run the migration again."
+        )
+    User.objects.exclude(email_address=Lower('email_address')).update(email_address=Lower('email_address'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_challenge_expiry_indexes'),
+    ]
+
+    operations = [
+        # The original casing is not kept, so there is nothing to restore.
+        migrations.RunPython(lowercase_email_addresses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,145 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:20
+
+import logging
+import re
+
+from django.db import migrations, models
+
+import users.operations
+
+logger = logging.getLogger(__name__)
+
+# Rows read and written per batch.
+CHUNK_SIZE = 500
+
+# Frozen copy of users.phone as of this migration, so later changes to the
+# normalization rules or to DEFAULT_PHONE_COUNTRY_CODE do not alter it.
+DEFAULT_COUNTRY_DIGITS = '254'
+SEPARATORS = re.compile(r'[\s\-.()/]')
+MIN_DIGITS = 7
+MAX_DIGITS = 15
+
+
+def normalize_country_code(country_code):
+    """``254``, ``+254`` or ``00254`` as ``+254``; None when not given or invalid"""
+    if not country_code:
+        return None
+    digits = SEPARATORS.sub('', str(country_code))
+    if digits.startswith('+'):
+        digits = digits[1:]
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    if not digits.isdigit() or not 1 <= len(digits) <= 3 or digits[0] == '0':
+        return None
+    return f'+{digits}'
+
+
+def to_e164(number, country_code):
+    """``number`` in E.164, or None when it is not a phone number"""
+    number = SEPARATORS.sub('', str(number))
+    if number.startswith('+'):
+        digits = number[1:]
+    elif number.startswith('00'):
+        digits = number[2:]
+    else:
+        country = normalize_country_code(country_code) if country_code else f'+{DEFAULT_COUNTRY_DIGITS}'
+        if country is None:
+            return None
+        country = country[1:]
+        if number.startswith('0'):
+            digits = country + number[1:]
+        elif number.startswith(country):
+            digits = number
+        else:
+            digits = country + number
+    if not digits.isdigit() or digits[0] == '0' or not MIN_DIGITS <= len(digits) <= MAX_DIGITS:
+        return None
+    return f'+{digits}'
+
+
+def e164_mobile_numbers(apps, schema_editor):
+    """
+    Rewrite country codes as ``+254`` and mobile numbers in E.164, in
+    batches of CHUNK_SIZE users. Values that are not phone numbers, or that
+    would collide with another account's number once normalized, are left
+    as they are and logged.
+    """
+    User = apps.get_model('users', 'User')
+    rows = (
+        User.objects.exclude(mobile_number__isnull=True, country_code__isnull=True)
+        .order_by('pk')
+        .values_list('pk', 'mobile_number', 'country_code')
+    )
+    invalid = []
+    collisions = []
+    last_pk = None
+    while True:
+        chunk = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+
+        targets = []
+        for pk, mobile_number, country_code in chunk:
+            new_country_code = normalize_country_code(country_code) or country_code
+            number = mobile_number
+            if mobile_number:
+                number = to_e164(mobile_number, new_country_code)
+                if number is None:
+                    invalid.append(mobile_number)
+                    number = mobile_number
+            targets.append((pk, mobile_number, country_code, new_country_code, number))
+
+        # Numbers already stored, including ones normalized by earlier batches.
+        taken = set(
+            User.objects.filter(
+                mobile_number__in={number for _, old, _, _, number in targets if number != old}
+            ).values_list('mobile_number', flat=True)
+        )
+        changed = []
+        for pk, old_number, old_country_code, country_code, number in targets:
+            if number != old_number:
+                if number in taken:
+                    collisions.append(old_number)
+                    number = old_number
+                else:
+                    taken.add(number)
+            if (country_code, number) != (old_country_code, old_number):
+                changed.append(User(pk=pk, country_code=country_code, mobile_number=number))
+        User.objects.bulk_update(changed, ['country_code', 'mobile_number'])
+
+    if invalid:
+        logger.warning(
+            "Left %d mobile number(s) that are not phone numbers: %s", len(invalid), ', '.join(invalid)
+        )
+    if collisions:
+        logger.warning(
+            "Left %d mobile number(s) that match another account once normalized: %s",
+            len(collisions), ', '.join(collisions),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_lowercase_email_addresses'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='mobile_number',
+            field=models.CharField(blank=True, max_length=16, null=True, unique=True),
+        ),
+        # The national formatting is not kept, so there is nothing to restore.
+        migrations.RunPython(e164_mobile_numbers, migrations.RunPython.noop),
+        # Phone search is now an anchored prefix match served by the unique
+        # column's varchar_pattern_ops index; the trigram index is unused.
+        users.operations.PostgresRunSQL(
+            sql='DROP INDEX IF EXISTS "users_mobile_number_trgm_idx";',
+            reverse_sql=(
+                'CREATE INDEX IF NOT EXISTS "users_mobile_number_trgm_idx" '
+                'ON "users" USING gin ((UPPER("mobile_number"::text)) gin_trgm_ops);'
+            ),
+        ),
+    ]
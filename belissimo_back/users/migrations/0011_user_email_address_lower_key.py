@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:24
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0010_e164_mobile_numbers'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email_address'), name='users_email_address_lower_key'),
+        ),
+    ]
@@ -1,15 +1,42 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
 from django.utils.translation import gettext_lazy as _
 import uuid
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils import timezone
 from datetime import timedelta
 import secrets
+import hashlib
 from django.core.exceptions import ValidationError
 from drf_spectacular.utils import extend_schema_field
+from .cache import invalidate_cached_user
+from .queries import update_returning, upsert_returning
+from .phone import InvalidPhoneNumber, normalize_country_code, to_e164
+
+def hash_reset_token(token):
+    """Return the fixed-length digest stored in place of a raw password reset token"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
 
 class CustomUserManager(BaseUserManager):
+    @classmethod
+    def normalize_email(cls, email):
+        """
+        Lowercase the whole address, not only the domain as BaseUserManager
+        does, so stored addresses and lookups agree regardless of casing and
+        every lookup is an exact probe of the unique index.
+        """
+        return (email or '').strip().lower()
+
+    def get_by_natural_key(self, username):
+        # Used by authenticate(); match however the client cased the address
+        return self.get_by_email(username)
+
+    def get_by_email(self, email_address):
+        return self.get(email_address=self.normalize_email(email_address))
+
     def create_user(self, email_address, password=None, **extra_fields):
         if not email_address:
             raise ValueError('The Email field must be set')
@@ -35,6 +62,71 @@ class CustomUserManager(BaseUserManager):
 
         return self.create_user(email_address, password, **extra_fields)
 
+    def social_upsert(self, email_address, provider, **extra_fields):
+        """
+        Sign a social login up or in with one INSERT ... ON CONFLICT statement.
+
+        Returns ``(user, created)``. A new account is created verified; an
+        existing account is returned as it is, provided it was registered
+        with the same ``provider``. Raises ValidationError otherwise, and for
+        ``provider='email'`` when the address is already registered.
+        """
+        candidate = self.model(
+            email_address=self.normalize_email(email_address),
+            provider=provider,
+            is_active=True,
+            verified_at=timezone.now(),
+            **extra_fields,
+        )
+        user = upsert_returning(candidate, ['email_address'], match_fields=['provider'], using=self.db)
+        created = user is not None and user.pk == candidate.pk
+        if created or (user is not None and provider != 'email'):
+            return user, created
+
+        # Unmatched conflict: one more read, only to word the error.
+        if provider == 'email':
+            raise ValidationError("A user with this email already exists.")
+        registered_with = self.filter(email_address=candidate.email_address).values_list('provider', flat=True).first()
+        raise ValidationError(
+            f"User is registered with {(registered_with or 'another provider').capitalize()}, "
+            f"not {provider.capitalize()}."
+        )
+
+    def get_by_password_reset_token(self, token):
+        """Look up a user and its challenge by raw reset token through the unique digest index"""
+        return self.select_related('credential_challenge').get(
+            credential_challenge__password_reset_token=hash_reset_token(token)
+        )
+
+    def consume_password_reset_token(self, token, new_password):
+        """
+        Set ``new_password`` for the holder of ``token``. The token is cleared
+        by one conditional UPDATE, so it can only be used once.
+
+        Returns the updated ``(id, email_address)`` as a dict, or None when the
+        token is unknown, expired or the account is blocked.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            challenges = update_returning(
+                UserCredentialChallenge.objects.using(self.db).filter(
+                    password_reset_token=hash_reset_token(token),
+                    password_reset_expires_at__gte=now,
+                ).filter(UserCredentialChallenge.not_blocked(now)),
+                ['user'],
+                **UserCredentialChallenge.CLEARED_RESET,
+            )
+            if not challenges:
+                return None
+            rows = update_returning(
+                self.filter(pk=challenges[0]['user_id']),
+                ['id', 'email_address'],
+                password=make_password(new_password),
+                last_login=now,
+            )
+        invalidate_cached_user(rows[0]['id'])
+        return rows[0]
+
 REGISTRATION_PROVIDERS = [
     ('email', 'Email Registration'),
     ('google', 'Google OAuth'),
@@ -47,7 +139,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     firstname = models.CharField(max_length=150)
     lastname = models.CharField(max_length=150, null=True, blank=True)
     country_code = models.CharField(max_length=5, null=True, blank=True)
-    mobile_number = models.CharField(max_length=15, unique=True, null=True, blank=True)
+    # E.164 ("+254712345678"). Being unique, it also gets a varchar_pattern_ops
+    # B-tree index on PostgreSQL, which serves the admin phone prefix search.
+    mobile_number = models.CharField(max_length=16, unique=True, null=True, blank=True)
     email_address = models.EmailField(unique=True)
     
     ROLE_CHOICES = [
@@ -77,14 +171,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     uid = models.CharField(max_length=255, null=True, blank=True)
     photo_url = models.URLField(max_length=500, null=True, blank=True)
     
-    verification_code = models.CharField(max_length=10, null=True, blank=True)
-    verification_code_expires_at = models.DateTimeField(null=True, blank=True)
     verified_at = models.DateTimeField(null=True, blank=True)
     
-    password_reset_token = models.CharField(max_length=100, null=True, blank=True)
-    password_reset_expires_at = models.DateTimeField(null=True, blank=True)
-    password_reset_attempts = models.PositiveIntegerField(default=0)
-    password_reset_blocked_until = models.DateTimeField(null=True, blank=True)
+    # Verification codes and reset tokens live in UserCredentialChallenge.
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -104,9 +193,31 @@ class User(AbstractBaseUser, PermissionsMixin):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Keyset pagination of list_users walks (created_at, id).
+            models.Index(fields=['created_at', 'id'], name='users_created_at_id_idx'),
+            # The pg_trgm GIN indexes used by admin name/phone search are
+            # PostgreSQL-only and live in migration 0004 rather than here.
+        ]
+        constraints = [
+            # Addresses are stored lowercased by the manager; this also stops
+            # update(), bulk_create() and raw SQL from adding a case twin.
+            models.UniqueConstraint(Lower('email_address'), name='users_email_address_lower_key'),
+        ]
     
     def __str__(self):
         return f"{self.firstname} {self.lastname} ({self.email_address})"
+
+    def save(self, *args, **kwargs):
+        self.email_address = User.objects.normalize_email(self.email_address)
+        try:
+            self.country_code = normalize_country_code(self.country_code)
+            if self.mobile_number:
+                self.mobile_number = to_e164(self.mobile_number, self.country_code)
+        except InvalidPhoneNumber:
+            # Serializers reject invalid numbers; legacy values are kept as they are
+            pass
+        super().save(*args, **kwargs)
     
     @property
     @extend_schema_field(str)
@@ -134,81 +245,274 @@ class User(AbstractBaseUser, PermissionsMixin):
         return True
     
     def generate_verification_code(self):
-        """Generate a 6-digit verification code"""
+        """Generate a 6-digit verification code and return it"""
         import random
-        self.verification_code = str(random.randint(100000, 999999))
-        self.verification_code_expires_at = timezone.now() + timedelta(minutes=20)
-        self.save(update_fields=['verification_code', 'verification_code_expires_at'])
+        code = str(random.randint(100000, 999999))
+        UserCredentialChallenge.objects.upsert(
+            self,
+            verification_code=code,
+            verification_code_expires_at=timezone.now() + timedelta(minutes=20),
+        )
+        return code
     
     def verify_code(self, code):
-        """Verify the provided code"""
-        if (self.verification_code == code and 
-            self.verification_code_expires_at and 
-            timezone.now() <= self.verification_code_expires_at):
-            self.verified_at = timezone.now()
-            self.verification_code = None
-            self.verification_code_expires_at = None
-            self.save(update_fields=['verified_at', 'verification_code', 'verification_code_expires_at'])
-            return True
-        return False
+        """
+        Verify the provided code. The code is cleared by one conditional
+        UPDATE, so concurrent submissions of the same code cannot both succeed
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            challenges = update_returning(
+                UserCredentialChallenge.objects.filter(
+                    user=self,
+                    verification_code=code,
+                    verification_code_expires_at__gte=now,
+                ),
+                ['user'],
+                verification_code=None,
+                verification_code_expires_at=None,
+            )
+            if not challenges:
+                return False
+            User.objects.filter(pk=self.pk).update(verified_at=now)
+        self.verified_at = now
+        invalidate_cached_user(self.pk)
+        return True
     
     def generate_password_reset_token(self):
         """Generate secure reset token with rate limiting"""
         now = timezone.now()
+        challenge = UserCredentialChallenge(user=self)
+        reset_token = challenge.assign_password_reset_token(now)
+        values = {field: getattr(challenge, field) for field in UserCredentialChallenge.RESET_FIELDS}
         
-        if self.password_reset_blocked_until and now < self.password_reset_blocked_until:
-            raise ValidationError("Too many reset attempts. Try again later.")
-        
-        self.password_reset_token = secrets.token_urlsafe(48)
-        self.password_reset_expires_at = now + timedelta(hours=1)
-        self.password_reset_attempts = 0
-        self.password_reset_blocked_until = None
-        self.save(update_fields=['password_reset_token', 'password_reset_expires_at', 
-                               'password_reset_attempts', 'password_reset_blocked_until'])
-        return self.password_reset_token
+        # The block check is part of the WHERE clause so a request racing a
+        # block being set cannot slip a fresh token in.
+        updated = UserCredentialChallenge.objects.filter(user=self).filter(
+            UserCredentialChallenge.not_blocked(now)
+        ).update(**values)
+        if not updated:
+            _, created = UserCredentialChallenge.objects.get_or_create(user=self, defaults=values)
+            if not created:
+                raise ValidationError("Too many reset attempts. Try again later.")
+        return reset_token
     
     def verify_password_reset_token(self, token):
         """Verify token with rate limiting and security checks"""
         now = timezone.now()
+        challenge = getattr(self, 'credential_challenge', None)
+        if challenge is None:
+            return False, "Invalid reset token"
         
-        if self.password_reset_blocked_until and now < self.password_reset_blocked_until:
+        if challenge.password_reset_blocked_until and now < challenge.password_reset_blocked_until:
             return False, "Too many attempts. Try again later."
         
-        if not self.password_reset_token or not self.password_reset_expires_at:
+        if not challenge.password_reset_token or not challenge.password_reset_expires_at:
             return False, "Invalid reset token"
         
-        if now > self.password_reset_expires_at:
+        if now > challenge.password_reset_expires_at:
             self.clear_password_reset_token()
             return False, "Reset token has expired"
         
-        if not secrets.compare_digest(self.password_reset_token, token):
+        if not secrets.compare_digest(challenge.password_reset_token, hash_reset_token(token)):
             self.increment_reset_attempts()
             return False, "Invalid reset token"
         
         return True, "Token valid"
     
     def increment_reset_attempts(self):
-        """Track failed attempts and implement rate limiting"""
-        self.password_reset_attempts += 1
-        
-        if self.password_reset_attempts >= 5:
-            self.password_reset_blocked_until = timezone.now() + timedelta(minutes=30)
-            self.clear_password_reset_token()
-        
-        self.save(update_fields=['password_reset_attempts', 'password_reset_blocked_until'])
+        """
+        Track failed attempts and implement rate limiting.
+
+        The counter is incremented by the database, and the fifth failure
+        blocks the user and drops the outstanding token in the same statement.
+        """
+        Challenge = UserCredentialChallenge
+        limit_reached = models.Q(password_reset_attempts__gte=Challenge.MAX_RESET_ATTEMPTS - 1)
+        rows = update_returning(
+            Challenge.objects.filter(user=self),
+            Challenge.RESET_FIELDS,
+            password_reset_attempts=models.F('password_reset_attempts') + 1,
+            password_reset_blocked_until=models.Case(
+                models.When(limit_reached, then=models.Value(timezone.now() + timedelta(minutes=30))),
+                default=models.F('password_reset_blocked_until'),
+            ),
+            password_reset_token=models.Case(
+                models.When(limit_reached, then=models.Value(None, output_field=models.CharField())),
+                default=models.F('password_reset_token'),
+            ),
+            password_reset_expires_at=models.Case(
+                models.When(limit_reached, then=models.Value(None, output_field=models.DateTimeField())),
+                default=models.F('password_reset_expires_at'),
+            ),
+        )
+        challenge = getattr(self, 'credential_challenge', None)
+        if rows and challenge is not None:
+            for attname, value in rows[0].items():
+                setattr(challenge, attname, value)
     
     def reset_password(self, new_password):
         """Reset password and clear all reset data"""
         self.set_password(new_password)
-        self.clear_password_reset_token()
         self.last_login = timezone.now()
-        self.save()
+        with transaction.atomic():
+            self.save(update_fields=['password', 'last_login'])
+            self.clear_password_reset_token()
     
     def clear_password_reset_token(self):
         """Clear all password reset related fields"""
-        self.password_reset_token = None
-        self.password_reset_expires_at = None
+        UserCredentialChallenge.objects.filter(user=self).update(**UserCredentialChallenge.CLEARED_RESET)
+        challenge = getattr(self, 'credential_challenge', None)
+        if challenge is not None:
+            for field, value in UserCredentialChallenge.CLEARED_RESET.items():
+                setattr(challenge, field, value)
+
+
+class UserCredentialChallengeManager(models.Manager):
+    def upsert(self, user, **values):
+        """Create or overwrite the user's challenge fields in a single INSERT ... ON CONFLICT"""
+        self.bulk_create(
+            [self.model(user=user, **values)],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=list(values),
+        )
+
+
+class UserCredentialChallenge(models.Model):
+    """
+    Short-lived verification and password reset state for a user.
+
+    Kept out of the ``users`` row so the principal loaded on every
+    authenticated request stays narrow, and so expired challenges can be
+    purged without touching user rows.
+    """
+    RESET_FIELDS = [
+        'password_reset_token',
+        'password_reset_expires_at',
+        'password_reset_attempts',
+        'password_reset_blocked_until',
+    ]
+    CLEARED_RESET = {
+        'password_reset_token': None,
+        'password_reset_expires_at': None,
+        'password_reset_attempts': 0,
+        'password_reset_blocked_until': None,
+    }
+    MAX_RESET_ATTEMPTS = 5
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='credential_challenge',
+    )
+    verification_code = models.CharField(max_length=10, null=True, blank=True)
+    verification_code_expires_at = models.DateTimeField(null=True, blank=True)
+
+    # SHA-256 hex digest of the emailed token; the raw token is never stored.
+    password_reset_token = models.CharField(max_length=64, null=True, blank=True)
+    password_reset_expires_at = models.DateTimeField(null=True, blank=True)
+    password_reset_attempts = models.PositiveIntegerField(default=0)
+    password_reset_blocked_until = models.DateTimeField(null=True, blank=True)
+
+    objects = UserCredentialChallengeManager()
+
+    class Meta:
+        db_table = 'user_credential_challenges'
+        verbose_name = 'Credential Challenge'
+        verbose_name_plural = 'Credential Challenges'
+        # Partial indexes for purge_credential_challenges; they only hold
+        # rows with outstanding state, so they stay small between purges.
+        indexes = [
+            models.Index(
+                fields=['verification_code_expires_at'],
+                condition=models.Q(verification_code_expires_at__isnull=False),
+                name='challenges_code_expiry_idx',
+            ),
+            models.Index(
+                fields=['password_reset_expires_at'],
+                condition=models.Q(password_reset_expires_at__isnull=False),
+                name='challenges_reset_expiry_idx',
+            ),
+            models.Index(
+                fields=['password_reset_blocked_until'],
+                condition=models.Q(password_reset_blocked_until__isnull=False),
+                name='challenges_blocked_until_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['password_reset_token'],
+                condition=models.Q(password_reset_token__isnull=False),
+                name='challenges_reset_token_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Challenge for {self.user_id}"
+
+    @staticmethod
+    def not_blocked(now):
+        return (
+            models.Q(password_reset_blocked_until__isnull=True) |
+            models.Q(password_reset_blocked_until__lte=now)
+        )
+
+    def assign_password_reset_token(self, now=None):
+        """Set a fresh reset token on the instance without saving and return the raw token"""
+        now = now or timezone.now()
+        reset_token = secrets.token_urlsafe(48)
+        self.password_reset_token = hash_reset_token(reset_token)
+        self.password_reset_expires_at = now + timedelta(hours=1)
         self.password_reset_attempts = 0
         self.password_reset_blocked_until = None
-        self.save(update_fields=['password_reset_token', 'password_reset_expires_at',
-                               'password_reset_attempts', 'password_reset_blocked_until'])
\ No newline at end of file
+        return reset_token
+
+class EmailOutbox(models.Model):
+    """
+    Transactional outbox for account emails.
+
+    Rows are written in the same transaction as the user change that
+    triggers them and delivered by the ``send_outbox_emails`` worker.
+    """
+    KIND_VERIFICATION = 'verification'
+    KIND_PASSWORD_RESET = 'password_reset'
+    KIND_CHOICES = [
+        (KIND_VERIFICATION, 'Verification'),
+        (KIND_PASSWORD_RESET, 'Password Reset'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    to_email = models.EmailField()
+    context = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = 'Email Outbox Entry'
+        verbose_name_plural = 'Email Outbox'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=models.Q(status='pending'),
+                name='email_outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.to_email} ({self.status})"
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class PostgresRunSQL(migrations.RunSQL):
+    """
+    ``RunSQL`` that only touches PostgreSQL databases, so SQLite test
+    databases can apply the same migrations without PostgreSQL-specific
+    DDL such as pg_trgm indexes.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        super().database_backwards(app_label, schema_editor, from_state, to_state)
@@ -1,5 +1,13 @@
-from  rest_framework.pagination import PageNumberPagination
-from .utils import paginated_custom_response
+import base64
+import json
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+from .custom import paginated_custom_response
 
 
 
@@ -13,4 +21,160 @@ class CustomPagination(PageNumberPagination):
             page=self.page,
             data=data,
             message="Data retrieved successfully"
-        )
\ No newline at end of file
+        )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite, unique ordering.
+
+    Pages are selected with a ``WHERE (created_at, id) > (cursor)`` style
+    predicate, range-bounded on ``created_at``, instead of ``OFFSET``, so
+    every page costs the same index range scan. Pagination is opt-in: ``paginate_queryset`` returns ``None`` unless
+    the request carries a ``cursor`` or ``page_size`` parameter.
+    """
+    ordering = ('created_at', 'id')
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor['reverse']
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if self.cursor is not None:
+            position = self.to_python_position(queryset.model, self.cursor['position'])
+            queryset = queryset.filter(self.get_position_filter(position, reverse))
+
+        # Fetch one extra row to find out whether another page follows.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return paginated_custom_response(
+            paginator=self,
+            page=None,
+            data=data,
+            message="Data retrieved successfully"
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        prefix = '-' if reverse else ''
+        return [prefix + field for field in self.ordering]
+
+    def get_position_filter(self, position, reverse=False):
+        """
+        Build ``(a, b) > (x, y)`` as ``a >= x AND (a > x OR (a = x AND b > y))``.
+
+        The OR alone cannot bound an index scan; the redundant leading
+        ``a >= x`` (``<=`` when reversed) gives the planner a range start on
+        the ``(created_at, id)`` index, so deep pages do not re-read the
+        rows before the cursor.
+        """
+        lookup = 'lt' if reverse else 'gt'
+        condition = models.Q()
+        for index, field in enumerate(self.ordering):
+            clause = models.Q(**{f'{field}__{lookup}': position[index]})
+            for previous_index in range(index):
+                clause &= models.Q(**{self.ordering[previous_index]: position[previous_index]})
+            condition |= clause
+        leading_bound = models.Q(**{f'{self.ordering[0]}__{lookup}e': position[0]})
+        return leading_bound & condition
+
+    def to_python_position(self, model, position):
+        try:
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_position(self, item):
+        if isinstance(item, Mapping):
+            values = [item[field] for field in self.ordering]
+        else:
+            values = [getattr(item, field) for field in self.ordering]
+        return [value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+            position = payload['p']
+            reverse = bool(payload.get('r', False))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'reverse': reverse}
+
+    def to_html(self):
+        return ''
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor returned in the `next`/`previous` links.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,113 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """
+    Timings collected while one request is handled.
+
+    Queries are aggregated by their parametrized SQL, so a request that runs
+    the same statement in a loop keeps one entry with a count.
+    """
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.action = None
+        self.started = time.perf_counter()
+        self.total = None
+        self.query_count = 0
+        self.query_time = 0.0
+        self.queries = {}
+        self.spans = {}
+
+    def add_query(self, sql, duration):
+        self.query_count += 1
+        self.query_time += duration
+        entry = self.queries.get(sql)
+        if entry is None:
+            self.queries[sql] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+
+    def add_span(self, name, duration):
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+        return self.total
+
+    def top_queries(self, limit):
+        ranked = sorted(self.queries.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {'sql': sql[:500], 'count': count, 'ms': round(duration * 1000, 2)}
+            for sql, (count, duration) in ranked[:limit]
+        ]
+
+    def timings(self):
+        """Milliseconds per component, in Server-Timing order"""
+        timings = {'db': self.query_time * 1000}
+        for name, duration in self.spans.items():
+            timings[name] = duration * 1000
+        timings['total'] = (self.total if self.total is not None else time.perf_counter() - self.started) * 1000
+        return timings
+
+    def as_dict(self, top_queries=5):
+        return {
+            'method': self.method,
+            'path': self.path,
+            'action': self.action,
+            'queries': self.query_count,
+            **{f'{name}_ms': round(value, 2) for name, value in self.timings().items()},
+            'top_queries': self.top_queries(top_queries),
+        }
+
+
+def begin(method, path):
+    """Start profiling the current request; returns the profile and a token for ``end``"""
+    profile = RequestProfile(method, path)
+    return profile, _current.set(profile)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def current_profile():
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the current request's ``name`` timing"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook that times every statement of a profiled request"""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_timer(connection):
+    """Attach ``record_query`` to a database connection once"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,86 @@
+import re
+
+from django.conf import settings
+
+# Spaces, dashes, dots and brackets people type inside phone numbers.
+SEPARATORS = re.compile(r'[\s\-.()/]')
+# E.164 allows at most 15 digits after the "+"; shorter than 7 is no
+# subscriber number anywhere.
+MIN_DIGITS = 7
+MAX_DIGITS = 15
+
+
+class InvalidPhoneNumber(ValueError):
+    """Raised when a value cannot be read as a phone number"""
+
+
+def default_country_digits():
+    return settings.DEFAULT_PHONE_COUNTRY_CODE.lstrip('+')
+
+
+def normalize_country_code(country_code):
+    """``254``, ``+254`` or ``00254`` as ``+254``; None when not given"""
+    if not country_code:
+        return None
+    digits = SEPARATORS.sub('', str(country_code))
+    if digits.startswith('+'):
+        digits = digits[1:]
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    if not digits.isdigit() or not 1 <= len(digits) <= 3 or digits[0] == '0':
+        raise InvalidPhoneNumber("Enter a valid country calling code, e.g. +254.")
+    return f'+{digits}'
+
+
+def _international_digits(number, country_code):
+    """
+    Digits after the "+" for ``number``: kept as they are when already
+    international (``+``/``00``), otherwise prefixed with the calling code of
+    ``country_code`` (or DEFAULT_PHONE_COUNTRY_CODE) after dropping a national
+    trunk ``0``.
+    """
+    number = SEPARATORS.sub('', str(number))
+    if number.startswith('+'):
+        return number[1:]
+    if number.startswith('00'):
+        return number[2:]
+    country = (normalize_country_code(country_code) or f'+{default_country_digits()}')[1:]
+    if number.startswith('0'):
+        return country + number[1:]
+    if number.startswith(country):
+        return number
+    return country + number
+
+
+def to_e164(number, country_code=None):
+    """
+    Normalize a phone number to E.164 (``+254712345678``).
+
+    ``0712 345 678`` and ``712345678`` are read as national numbers in
+    ``country_code`` (default DEFAULT_PHONE_COUNTRY_CODE); ``+254 712...``,
+    ``00254 712...`` and ``254712...`` are already international. Raises
+    InvalidPhoneNumber for anything else.
+    """
+    digits = _international_digits(number, country_code)
+    if not digits.isdigit() or digits[0] == '0' or not MIN_DIGITS <= len(digits) <= MAX_DIGITS:
+        raise InvalidPhoneNumber("Enter a valid phone number, e.g. +254712345678 or 0712345678.")
+    return f'+{digits}'
+
+
+def search_prefix(fragment):
+    """
+    The E.164 prefix a partial number typed into the admin phone filter
+    stands for, read like ``to_e164`` input (``0712`` → ``+254712``).
+    A fragment that is the start of the default calling code is read as
+    that code being typed (``25`` → ``+25``). None when the fragment holds
+    no digits.
+    """
+    if not any(char.isdigit() for char in str(fragment)):
+        return None
+    typed = SEPARATORS.sub('', str(fragment))
+    if typed.isdigit() and default_country_digits().startswith(typed):
+        return f'+{typed}'
+    digits = _international_digits(fragment, None)
+    if not digits.isdigit():
+        return None
+    return f'+{digits}'
@@ -0,0 +1,123 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models import sql
+
+
+def supports_update_returning(connection):
+    """True when the backend accepts ``UPDATE ... RETURNING`` (PostgreSQL, SQLite 3.35+)"""
+    return connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_columns_from_insert
+
+
+def _convert_row(connection, fields, row):
+    values = {}
+    for field, value in zip(fields, row):
+        col = field.get_col(field.model._meta.db_table)
+        for converter in connection.ops.get_db_converters(col) + col.get_db_converters(connection):
+            value = converter(value, col, connection)
+        values[field.attname] = value
+    return values
+
+
+def update_returning(queryset, returning, **values):
+    """
+    Apply ``queryset.update(**values)`` as a single ``UPDATE ... RETURNING``
+    statement and return the post-update ``returning`` columns of every
+    matched row as dicts keyed by attribute name.
+
+    ``values`` accepts the same expressions as ``QuerySet.update()`` (``F()``,
+    ``Case()``...), so conditional counters are evaluated by the database
+    against the current row. Backends without ``UPDATE ... RETURNING`` fall
+    back to lock, update and re-read inside one transaction.
+    """
+    model = queryset.model
+    fields = [model._meta.get_field(name) for name in returning]
+    connection = connections[queryset.db]
+
+    if not supports_update_returning(connection):
+        with transaction.atomic(using=queryset.db):
+            pks = list(queryset.select_for_update().values_list('pk', flat=True))
+            if not pks:
+                return []
+            model._default_manager.using(queryset.db).filter(pk__in=pks).update(**values)
+            return list(
+                model._default_manager.using(queryset.db)
+                .filter(pk__in=pks)
+                .values(*[field.attname for field in fields])
+            )
+
+    query = queryset.query.chain(sql.UpdateQuery)
+    query.add_update_values(values)
+    try:
+        statement, params = query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        # The filter can match nothing, e.g. ``pk__in=[]`` or ``none()``.
+        return []
+    if not statement:
+        return []
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    statement = f'{statement} RETURNING {columns}'
+
+    with transaction.mark_for_rollback_on_error(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute(statement, params)
+            rows = cursor.fetchall()
+    return [_convert_row(connection, fields, row) for row in rows]
+
+
+def upsert_returning(obj, unique_fields, match_fields=(), using='default'):
+    """
+    Insert ``obj`` with a single ``INSERT ... ON CONFLICT (unique_fields)
+    DO UPDATE ... RETURNING`` statement and return the stored row as a
+    model instance.
+
+    On conflict the existing row is returned unchanged, but only when its
+    ``match_fields`` equal those of ``obj``; otherwise None is returned. The
+    conflicting row is locked by the no-op update, so concurrent first
+    inserts of the same key all get the one stored row. Compare the returned
+    primary key with ``obj.pk`` to tell an insert from an existing row.
+    Backends without ``RETURNING`` fall back to lock, insert or re-read
+    inside one transaction.
+    """
+    model = type(obj)
+    opts = model._meta
+    connection = connections[using]
+    fields = list(opts.local_concrete_fields)
+
+    if not supports_update_returning(connection):
+        with transaction.atomic(using=using):
+            lookup = {name: getattr(obj, name) for name in unique_fields}
+            existing = model._default_manager.using(using).select_for_update().filter(**lookup).first()
+            if existing is None:
+                obj.save(force_insert=True, using=using)
+                return obj
+            if all(getattr(existing, name) == getattr(obj, name) for name in match_fields):
+                return existing
+            return None
+
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    params = [field.get_db_prep_save(field.pre_save(obj, add=True), connection) for field in fields]
+    conflict = ', '.join(qn(opts.get_field(name).column) for name in unique_fields)
+    # Re-assigning the conflict key leaves the row as it was but makes
+    # DO UPDATE (unlike DO NOTHING) return it.
+    key = qn(opts.get_field(unique_fields[0]).column)
+    statement = (
+        f'INSERT INTO {qn(opts.db_table)} ({columns}) VALUES ({placeholders}) '
+        f'ON CONFLICT ({conflict}) DO UPDATE SET {key} = EXCLUDED.{key}'
+    )
+    if match_fields:
+        statement += ' WHERE ' + ' AND '.join(
+            f'{qn(opts.db_table)}.{qn(column)} = EXCLUDED.{qn(column)}'
+            for column in (opts.get_field(name).column for name in match_fields)
+        )
+    statement += f' RETURNING {columns}'
+
+    with transaction.mark_for_rollback_on_error(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(statement, params)
+            row = cursor.fetchone()
+    if row is None:
+        return None
+    values = _convert_row(connection, fields, row)
+    return model.from_db(using, list(values), list(values.values()))
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+RATE_PATTERN = re.compile(r'^(\d+)/(\d*)([smhd])$')
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class RateLimit:
+    """
+    A rate limit policy: at most ``limit`` hits per sliding ``window`` for
+    one client, identified by ``key``:
+
+    * ``'ip'`` - the client address (honours DRF's ``NUM_PROXIES``)
+    * ``'user'`` - the authenticated user's id
+    * any other value - that field of the request body, e.g. ``'email_address'``
+
+    ``rate`` uses the ``'<count>/<period>'`` notation, e.g. ``'5/m'`` or ``'1/30m'``.
+    """
+
+    def __init__(self, scope, rate, key='ip'):
+        match = RATE_PATTERN.match(rate)
+        if not match:
+            raise ValueError(f"Invalid rate '{rate}'")
+        count, multiplier, unit = match.groups()
+        self.scope = scope
+        self.rate = rate
+        self.key = key
+        self.limit = int(count)
+        self.window = int(multiplier or 1) * PERIODS[unit]
+
+    def __repr__(self):
+        return f"RateLimit({self.scope!r}, {self.rate!r}, key={self.key!r})"
+
+    def identify(self, request, data=None):
+        """Return the client identity this policy counts against, or None to skip it"""
+        if self.key == 'ip':
+            return BaseThrottle().get_ident(request)
+        if self.key == 'user':
+            user = getattr(request, 'user', None)
+            return str(user.pk) if user is not None and user.is_authenticated else None
+        value = (data or {}).get(self.key) if hasattr(data, 'get') else None
+        if value is None:
+            return None
+        return str(value).strip().lower() or None
+
+    def cache_key(self, ident):
+        digest = hashlib.sha256(ident.encode()).hexdigest()[:32]
+        return f"rl:{self.scope}:{self.key}:{digest}"
+
+
+class LocalBackend:
+    """
+    In-process sliding-window log. Counters are per process, so this is
+    only meant for tests and single-process development servers.
+    """
+
+    def __init__(self):
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window):
+        """Record a hit; return ``(allowed, retry_after_seconds)``"""
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            if len(hits) < limit:
+                hits.append(now)
+                return True, 0.0
+            return False, hits[0] + window - now
+
+    def reset(self):
+        with self._lock:
+            self._hits.clear()
+
+
+class RedisBackend:
+    """
+    Sliding-window log in a Redis sorted set, shared by every worker. The
+    trim/count/add sequence runs as one Lua script so concurrent hits from
+    different processes cannot overshoot the limit.
+    """
+
+    SCRIPT = """
+    local key = KEYS[1]
+    local now = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local limit = tonumber(ARGV[3])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) < limit then
+        redis.call('ZADD', key, now, ARGV[4])
+        redis.call('PEXPIRE', key, math.ceil(window * 1000))
+        return {1, '0'}
+    end
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    return {0, tostring(tonumber(oldest[2]) + window - now)}
+    """
+
+    def __init__(self, url=None):
+        import redis
+
+        self.client = redis.Redis.from_url(url or settings.RATE_LIMIT_REDIS_URL)
+        self.script = self.client.register_script(self.SCRIPT)
+
+    def hit(self, key, limit, window):
+        """Record a hit; return ``(allowed, retry_after_seconds)``"""
+        now = time.time()
+        allowed, retry_after = self.script(
+            keys=[key], args=[now, window, limit, f"{now}:{uuid.uuid4().hex}"]
+        )
+        return bool(allowed), max(float(retry_after), 0.0)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.RATE_LIMIT_BACKEND)()
+    return _backend
+
+
+def check_rate_limits(policies, request, data=None):
+    """
+    Count this request against every applicable policy.
+
+    Returns None when the request is allowed, otherwise the number of seconds
+    until it would be. Backend outages fail open so a Redis hiccup cannot
+    lock everyone out of authentication.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    for policy in policies:
+        ident = policy.identify(request, data)
+        if ident is None:
+            continue
+        try:
+            allowed, retry_after = get_backend().hit(policy.cache_key(ident), policy.limit, policy.window)
+        except Exception:
+            logger.exception("Rate limit backend unavailable, allowing request")
+            return None
+        if not allowed:
+            RATE_LIMITED.labels(policy.scope, policy.key).inc()
+            logger.warning(
+                "Rate limit %s (%s per %s) exceeded", policy.scope, policy.rate, policy.key,
+                extra={'scope': policy.scope, 'rate': policy.rate, 'key': policy.key, 'retry_after': retry_after},
+            )
+            return retry_after
+    return None
+
+
+class PolicyRateThrottle(BaseThrottle):
+    """
+    DRF throttle enforcing the ``rate_limits`` declared on the view, which
+    viewset actions set with ``@action(..., rate_limits=[...])``.
+    """
+
+    def allow_request(self, request, view):
+        self.retry_after = check_rate_limits(getattr(view, 'rate_limits', ()), request, request.data)
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
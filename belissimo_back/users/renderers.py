@@ -0,0 +1,64 @@
+import orjson
+from django.http import HttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# UUIDs, datetimes, dates and dataclasses are serialized by orjson itself;
+# anything else (lazy translations, Decimal, timedelta, querysets) goes
+# through DRF's encoder so output matches the stock JSONRenderer.
+_fallback = JSONEncoder().default
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(data, option=0):
+    """Serialize ``data`` to UTF-8 JSON bytes"""
+    return orjson.dumps(data, default=_fallback, option=ORJSON_OPTIONS | option)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in replacement for ``rest_framework.renderers.JSONRenderer`` backed by orjson"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        option = 0
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson only supports two-space indentation.
+            option = orjson.OPT_INDENT_2
+        return dumps(data, option)
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        if accepted_media_type:
+            for param in accepted_media_type.split(';')[1:]:
+                key, _, value = param.strip().partition('=')
+                if key == 'indent' and value:
+                    return True
+        return bool(renderer_context.get('indent'))
+
+
+class ORJSONParser(BaseParser):
+    """Parse JSON request bodies with orjson"""
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return None
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class ORJSONResponse(HttpResponse):
+    """``JsonResponse`` equivalent for plain Django views, serialized with orjson"""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
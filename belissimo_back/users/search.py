@@ -0,0 +1,74 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections, models
+from django.db.models.functions import Greatest
+
+from .phone import search_prefix
+
+
+ROLE_FILTERS = ['landlord', 'tenant', 'admin']
+
+
+def supports_trigram_search(queryset):
+    """pg_trgm is only available on PostgreSQL; other backends fall back to plain LIKE"""
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def search_by_name(queryset, name):
+    """
+    Match ``name`` anywhere in the first or last name.
+
+    On PostgreSQL the ``icontains`` predicates are served by the
+    ``gin_trgm_ops`` expression indexes on ``UPPER(firstname::text)`` and
+    ``UPPER(lastname::text)``, and each row is annotated with a
+    ``search_rank`` trigram similarity score.
+    """
+    queryset = queryset.filter(
+        models.Q(firstname__icontains=name) |
+        models.Q(lastname__icontains=name)
+    )
+    if supports_trigram_search(queryset):
+        queryset = queryset.annotate(
+            search_rank=Greatest(
+                TrigramSimilarity('firstname', name),
+                TrigramSimilarity('lastname', name),
+            )
+        )
+    return queryset
+
+
+def search_by_phone(queryset, phone):
+    """
+    Match mobile numbers starting with ``phone``, read as E.164 like stored
+    numbers (``0712`` matches ``+254712...``).
+
+    The anchored, case-sensitive ``LIKE '+254712%'`` is a range scan of the
+    ``varchar_pattern_ops`` index PostgreSQL keeps for the unique column.
+    """
+    prefix = search_prefix(phone)
+    if prefix is None:
+        return queryset.none()
+    return queryset.filter(mobile_number__startswith=prefix)
+
+
+def filter_users(queryset, params):
+    """Apply the admin ``role``/``name``/``phone`` filters to a user queryset"""
+    role = params.get('role')
+    if role in ROLE_FILTERS:
+        queryset = queryset.filter(role=role)
+
+    name = params.get('name')
+    if name:
+        queryset = search_by_name(queryset, name)
+
+    phone = params.get('phone')
+    if phone:
+        queryset = search_by_phone(queryset, phone)
+
+    return queryset
+
+
+def order_by_rank(queryset):
+    """Put the best name matches first when the queryset carries a search rank"""
+    if 'search_rank' in queryset.query.annotations:
+        return queryset.order_by('-search_rank', 'created_at', 'id')
+    return queryset
@@ -2,11 +2,77 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from django.utils import timezone
-from django.db import IntegrityError
+from django.db import IntegrityError, models
+from django.db.models import Q
 from .models import User
+from .perf import span
+from .phone import InvalidPhoneNumber, normalize_country_code, to_e164
+
+# Unique user columns checked together before an insert.
+UNIQUE_FIELDS = ('email_address', 'mobile_number', 'identification_number')
+
+
+class NormalizedEmailField(serializers.EmailField):
+    """
+    EmailField that lowercases input the way ``CustomUserManager.normalize_email``
+    stores it, before validators such as UniqueValidator run.
+    """
+
+    def to_internal_value(self, data):
+        return User.objects.normalize_email(super().to_internal_value(data))
+
+
+# serializer_field_mapping for ModelSerializers that accept email_address
+EMAIL_FIELD_MAPPING = {
+    **serializers.ModelSerializer.serializer_field_mapping,
+    models.EmailField: NormalizedEmailField,
+}
+
+
+def unique_error(field):
+    return f"User with this {field.replace('_', ' ')} already exists."
+
+
+def unique_violation_errors(error):
+    """
+    Field errors for an IntegrityError raised by one of the unique user
+    columns, or None for any other integrity failure. The PostgreSQL
+    constraint name (``users_email_address_key``) and the SQLite message
+    (``users.email_address``) both name the column.
+    """
+    diag = getattr(error.__cause__, 'diag', None)
+    text = getattr(diag, 'constraint_name', None) or str(error)
+    for field in UNIQUE_FIELDS:
+        if User._meta.get_field(field).column in text:
+            return {field: [unique_error(field)]}
+    return None
+
+
+def normalize_phone(attrs, instance=None):
+    """
+    Rewrite ``country_code`` and ``mobile_number`` in ``attrs`` to the stored
+    E.164 form, raising field errors for values that are not phone numbers.
+    """
+    if 'country_code' in attrs:
+        try:
+            attrs['country_code'] = normalize_country_code(attrs['country_code'])
+        except InvalidPhoneNumber as e:
+            raise serializers.ValidationError({'country_code': [str(e)]})
+    if 'mobile_number' in attrs:
+        if not attrs['mobile_number']:
+            attrs['mobile_number'] = None
+            return attrs
+        country_code = attrs.get('country_code', getattr(instance, 'country_code', None))
+        try:
+            attrs['mobile_number'] = to_e164(attrs['mobile_number'], country_code)
+        except InvalidPhoneNumber as e:
+            raise serializers.ValidationError({'mobile_number': [str(e)]})
+    return attrs
+
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = EMAIL_FIELD_MAPPING
+
     password = serializers.CharField(
         write_only=True,
         validators=[validate_password],
@@ -28,6 +94,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             'email_address', 'password', 'password_confirm', 'role',
             'identification_number'
         ]
+        # Replaced by the single query in check_unique().
+        extra_kwargs = {field: {'validators': []} for field in UNIQUE_FIELDS}
 
     def validate(self, attrs):
         if not attrs.get('mobile_number'):
@@ -42,14 +110,61 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         if attrs.get('role') not in ['landlord', 'tenant']:
             raise serializers.ValidationError({"role": "Role must be either 'landlord' or 'tenant'."})
         
+        normalize_phone(attrs)
+        self.check_unique(attrs)
         return attrs
 
+    def check_unique(self, attrs):
+        """
+        Check every unique value given in one query with OR'd predicates,
+        reporting each field that is already taken.
+        """
+        values = {field: attrs[field] for field in UNIQUE_FIELDS if attrs.get(field)}
+        if not values:
+            return
+        predicate = Q()
+        for field, value in values.items():
+            predicate |= Q(**{field: value})
+        errors = {}
+        for row in User.objects.filter(predicate).values_list(*values)[:len(values)]:
+            for field, value in zip(values, row):
+                if value == values[field]:
+                    errors[field] = [unique_error(field)]
+        if errors:
+            raise serializers.ValidationError(errors)
+
     def create(self, validated_data):
         validated_data.pop('password_confirm', None)
-        user = User.objects.create_user(**validated_data)
+        try:
+            user = User.objects.create_user(**validated_data)
+        except IntegrityError as e:
+            # Taken by a concurrent registration after check_unique() ran
+            errors = unique_violation_errors(e)
+            if errors is None:
+                raise
+            raise serializers.ValidationError(errors)
         return user
 
+class UserImportSerializer(UserRegistrationSerializer):
+    """
+    Registration rules for one bulk import row. Uniqueness is checked for
+    the whole file at once by ``users.importer`` instead of per row.
+    """
+    def check_unique(self, attrs):
+        pass
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        for field in ('lastname', 'country_code', 'identification_number'):
+            if not attrs.get(field):
+                attrs[field] = None
+        attrs.pop('password', None)
+        attrs.pop('password_confirm', None)
+        return attrs
+
 class SocialRegistrationSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = EMAIL_FIELD_MAPPING
+
     class Meta:
         model = User
         fields = ['firstname', 'lastname', 'email_address', 'provider', 'uid', 'photo_url', 'role']
@@ -57,44 +172,111 @@ class SocialRegistrationSerializer(serializers.ModelSerializer):
             'email_address': {'validators': []}  # Disable default uniqueness validation
         }
 
-    def validate_email_address(self, value):
-        provider = self.initial_data.get('provider')
-        if provider == 'email' and User.objects.filter(email_address=value).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return value
-
     def validate(self, attrs):
         if attrs.get('role') not in ['landlord', 'tenant']:
             raise serializers.ValidationError({"role": "Role must be either 'landlord' or 'tenant'."})
         return attrs
 
     def create(self, validated_data):
-        provider = validated_data.get('provider')
-        email = validated_data.get('email_address')
-        user = User.objects.filter(email_address=email).first()
-        if user:
-            if user.provider != provider:
-                raise serializers.ValidationError(
-                    f"User is registered with {user.provider.capitalize()}, not {provider.capitalize()}."
-                )
-            return user
+        """
+        Sign up or sign in through ``User.objects.social_upsert``; whether
+        the account is new is kept on ``self.created``.
+        """
+        validated_data = dict(validated_data)
         try:
-            user = User.objects.create_user(
-                **validated_data,
-                provider=provider,
-                is_active=True
+            user, self.created = User.objects.social_upsert(
+                validated_data.pop('email_address'),
+                validated_data.pop('provider', 'email'),
+                **validated_data
             )
-            user.verified_at = timezone.now()
-            user.save()
-            return user
-        except IntegrityError:
-            raise serializers.ValidationError("Failed to create user due to a conflict.")
+        except ValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return user
 
 class UserLoginSerializer(serializers.Serializer):
-    email_address = serializers.EmailField()
+    email_address = NormalizedEmailField()
     password = serializers.CharField(style={'input_type': 'password'})
 
-class UserSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    ``?fields=id,full_name,role`` support for read serializers.
+
+    The requested names are passed as ``context['fields']``; every other
+    field is dropped before serialization. ``computed_fields`` lists the
+    model columns each read-only property is built from, so views can
+    narrow the SQL to exactly what the response needs.
+    """
+    computed_fields = {
+        'full_name': ('firstname', 'lastname'),
+        'is_verified': ('verified_at',),
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, value):
+        """
+        Return the requested field names in declaration order, or None when
+        ``value`` is empty. Unknown names raise a ValidationError.
+        """
+        if not value:
+            return None
+        requested = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = requested - set(cls.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                          f"Choose from: {', '.join(cls.Meta.fields)}."
+            })
+        return [name for name in cls.Meta.fields if name in requested] or None
+
+    @classmethod
+    def columns(cls, fields=None):
+        """Model columns needed to render ``fields`` (all fields when None)"""
+        columns = {}
+        for name in fields or cls.Meta.fields:
+            for column in cls.computed_fields.get(name, (name,)):
+                columns[column] = None
+        return list(columns)
+
+    @classmethod
+    def represent_rows(cls, rows, fields=None):
+        """
+        Render ``.values()`` dicts without instantiating models or running
+        the serializer fields. Must stay in step with the model properties.
+        """
+        fields = fields or cls.Meta.fields
+        # Evaluate a queryset first so its SQL is not counted as serializer time.
+        rows = list(rows)
+        data = []
+        with span('serializer'):
+            for row in rows:
+                item = {}
+                for name in fields:
+                    if name == 'full_name':
+                        item[name] = f"{row['firstname']} {row['lastname']}".strip()
+                    elif name == 'is_verified':
+                        item[name] = row['verified_at'] is not None
+                    else:
+                        item[name] = row[name]
+                data.append(item)
+        return data
+
+class TimedRepresentationMixin:
+    """Count ``to_representation`` towards the request's ``serializer`` timing"""
+
+    def to_representation(self, instance):
+        with span('serializer'):
+            return super().to_representation(instance)
+
+class UserSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    serializer_field_mapping = EMAIL_FIELD_MAPPING
+
     full_name = serializers.ReadOnlyField()
     is_verified = serializers.ReadOnlyField()
 
@@ -106,8 +288,28 @@ class UserSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'role', 'identification_number'
         ]
         read_only_fields = ['id', 'verified_at', 'created_at', 'updated_at']
+        # Checked in validate() once the number is in E.164 form
+        extra_kwargs = {'mobile_number': {'validators': []}}
+
+    def validate(self, attrs):
+        normalize_phone(attrs, self.instance)
+        number = attrs.get('mobile_number')
+        if number:
+            taken = User.objects.filter(mobile_number=number)
+            if self.instance is not None:
+                taken = taken.exclude(pk=self.instance.pk)
+            if taken.exists():
+                raise serializers.ValidationError({'mobile_number': [unique_error('mobile_number')]})
+        return attrs
+
+    def update(self, instance, validated_data):
+        """Write only the submitted fields rather than the whole row"""
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
 
     class Meta:
@@ -118,11 +320,11 @@ class UserListSerializer(serializers.ModelSerializer):
         ]
 
 class AccountVerificationSerializer(serializers.Serializer):
-    email_address = serializers.EmailField()
+    email_address = NormalizedEmailField()
     verification_code = serializers.CharField(max_length=10)
 
 class PasswordResetRequestSerializer(serializers.Serializer):
-    email_address = serializers.EmailField()
+    email_address = NormalizedEmailField()
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
     token = serializers.CharField(max_length=64)
@@ -0,0 +1,51 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+
+from users.hashing import password_needs_rehash
+from users.models import User
+
+PASSWORD = 'Passw0rd!x'
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, LAST_LOGIN_WRITE_BEHIND=False)
+class AsyncLoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'async@example.com', PASSWORD, firstname='Async', verified_at=timezone.now(),
+        )
+        # A hash from an older release with a lower work factor.
+        User.objects.filter(pk=cls.user.pk).update(
+            password=PBKDF2PasswordHasher().encode(PASSWORD, 'oldsalt', iterations=1000)
+        )
+
+    def login(self, password=PASSWORD):
+        return AsyncClient().post(
+            '/api/users/login-async/',
+            {'email_address': 'async@example.com', 'password': password},
+            content_type='application/json',
+        )
+
+    async def test_login_upgrades_an_outdated_hash(self):
+        old = (await User.objects.aget(pk=self.user.pk)).password
+        self.assertTrue(password_needs_rehash(old))
+
+        response = await self.login()
+
+        self.assertEqual(response.status_code, 200, response.content)
+        new = (await User.objects.aget(pk=self.user.pk)).password
+        self.assertNotEqual(new, old)
+        self.assertFalse(password_needs_rehash(new))
+        self.assertTrue(check_password(PASSWORD, new))
+
+    async def test_wrong_password(self):
+        response = await self.login('wrong')
+        self.assertEqual(response.status_code, 401)
+        self.assertTrue(password_needs_rehash((await User.objects.aget(pk=self.user.pk)).password))
+
+    async def test_overloaded_pool_sheds_the_attempt(self):
+        with self.settings(LOGIN_HASH_MAX_PENDING=0):
+            response = await self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
@@ -0,0 +1,28 @@
+from django.test import TestCase, override_settings
+
+from users.benchmark import seed_users
+from users.budgets import ACTION_BUDGETS, build_cases, check_case
+from users.views import UserViewSet
+
+MODEL_ACTIONS = ('list', 'create', 'retrieve', 'update', 'partial_update', 'destroy')
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, PERF_SLOW_REQUEST_MS=10 ** 9)
+class ActionBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.member = seed_users(20)
+
+    def test_every_action_has_a_budget_and_a_case(self):
+        actions = set(MODEL_ACTIONS) | {extra.__name__ for extra in UserViewSet.get_extra_actions()}
+        for extra in UserViewSet.get_extra_actions():
+            actions |= set(extra.mapping.values())
+        self.assertEqual(set(ACTION_BUDGETS), actions)
+        self.assertEqual(set(build_cases(self.admin, self.member)), actions)
+
+    def test_actions_stay_within_budget(self):
+        cases = build_cases(self.admin, self.member)
+        for action, budget in ACTION_BUDGETS.items():
+            with self.subTest(action=action):
+                measured = check_case(cases[action], budget)
+                self.assertEqual(measured.violations(), [], measured.report())
@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from users.authentication import CookieJWTAuthentication, api_settings
+from users.cache import cache_user, get_cached_user, user_cache_key
+from users.models import User
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            'cached@example.com', 'Passw0rd!x', firstname='Cached', uid='social-id', verified_at=timezone.now(),
+        )
+
+    def test_credentials_are_not_cached(self):
+        cache_user(self.user)
+
+        _, values, _ = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn('password', values)
+        self.assertNotIn('uid', values)
+        self.assertNotIn(self.user.password, repr(values))
+
+    def test_cached_user_round_trip(self):
+        cache_user(self.user)
+
+        with self.assertNumQueries(0):
+            user, _ = get_cached_user(self.user.pk)
+            self.assertEqual((user.pk, user.email_address, user.verified_at), (
+                self.user.pk, self.user.email_address, self.user.verified_at,
+            ))
+            self.assertFalse(user._state.adding)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.password, self.user.password)
+
+    def test_saving_a_cached_user_keeps_the_password(self):
+        cache_user(self.user)
+        user, _ = get_cached_user(self.user.pk)
+        user.firstname = 'Renamed'
+        user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.firstname, 'Renamed')
+        self.assertTrue(self.user.check_password('Passw0rd!x'))
+
+    def test_revoke_claim_is_checked_against_the_cached_digest(self):
+        token = AccessToken.for_user(self.user)
+        token[api_settings.REVOKE_TOKEN_CLAIM] = get_md5_hash_password(self.user.password)
+        authentication = CookieJWTAuthentication()
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True):
+            authentication.get_user(token)  # caches the user
+            with self.assertNumQueries(0):
+                self.assertEqual(authentication.get_user(token).pk, self.user.pk)
+
+            self.user.set_password('N3w-passw0rd')
+            self.user.save()  # invalidates the cache
+            authentication.get_user(AccessToken.for_user(self.user))  # re-caches with the new digest
+            with self.assertRaises(AuthenticationFailed):
+                authentication.get_user(token)
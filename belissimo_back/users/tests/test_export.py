@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from users.benchmark import BENCH_PASSWORD, logged_in_client
+from users.export import csv_value
+from users.models import User
+
+
+class CsvValueTests(SimpleTestCase):
+    def test_formula_cells_are_escaped(self):
+        for value in ('=HYPERLINK("http://x","y")', '+254712345678', '-1', '@SUM(A1)', '\tx', '\rx'):
+            with self.subTest(value=value):
+                self.assertEqual(csv_value(value), "'" + value)
+
+    def test_other_values(self):
+        self.assertEqual(csv_value('Alice'), 'Alice')
+        self.assertEqual(csv_value(None), '')
+        self.assertEqual(csv_value(True), True)
+
+
+class ExportUsersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_superuser('admin@example.com', BENCH_PASSWORD, firstname='Admin')
+        for i in range(3):
+            User.objects.create_user(
+                f'export-{i}@example.com', BENCH_PASSWORD, firstname=f'Export{i}', verified_at=timezone.now(),
+            )
+        User.objects.create_user('formula@example.com', BENCH_PASSWORD, firstname='=HYPERLINK("http://x")')
+
+    def setUp(self):
+        self.client = logged_in_client('admin@example.com')
+
+    def read_csv(self, response):
+        return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_csv(self):
+        response = self.client.get('/api/users/export/?type=csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="users.csv"')
+        rows = self.read_csv(response)
+        self.assertEqual(len(rows), 5)
+        firstnames = {row['firstname'] for row in rows}
+        self.assertIn('Export0', firstnames)
+        self.assertIn('\'=HYPERLINK("http://x")', firstnames)
+
+    def test_ndjson_is_not_escaped(self):
+        response = self.client.get('/api/users/export/?type=ndjson')
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertIn('=HYPERLINK("http://x")', {row['firstname'] for row in rows})
+
+    def test_unknown_type(self):
+        self.assertEqual(self.client.get('/api/users/export/?type=xml').status_code, 400)
+
+    async def test_asgi_streams_an_async_iterator(self):
+        client = AsyncClient()
+        client.cookies = self.client.cookies
+        response = await client.get('/api/users/export/?type=csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 6)
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from users.importer import import_users
+from users.metrics import EMAILS
+from users.models import EmailOutbox, User
+
+
+def row(n, **fields):
+    return {'firstname': 'Import', 'email_address': f'import-{n}@example.com', 'role': 'tenant', **fields}
+
+
+def queued():
+    return EMAILS.labels(EmailOutbox.KIND_PASSWORD_RESET, 'queued')._value.get()
+
+
+class ImportUsersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin@example.com', 'Passw0rd!x', firstname='Admin')
+
+    def test_creates_rows_and_queues_invites(self):
+        before = queued()
+        with self.captureOnCommitCallbacks(execute=True):
+            results = import_users([row(1), row(2)], created_by=self.admin)
+
+        self.assertEqual([result['status'] for result in results], ['created', 'created'])
+        self.assertEqual(EmailOutbox.objects.filter(kind=EmailOutbox.KIND_PASSWORD_RESET).count(), 2)
+        self.assertEqual(queued(), before + 2)
+
+    def test_reports_invalid_and_duplicate_rows(self):
+        User.objects.create_user('import-1@example.com', 'Passw0rd!x', firstname='Taken')
+        results = import_users(
+            [row(1), row(2), row(2, firstname='Again'), {'firstname': 'No email'}], created_by=self.admin,
+        )
+
+        self.assertEqual([result['status'] for result in results], ['error', 'created', 'error', 'error'])
+        self.assertEqual(results[0]['errors'], {'email_address': ['User with this email address already exists.']})
+        self.assertIn('Duplicate', results[2]['errors']['email_address'][0])
+        self.assertIn('email_address', results[3]['errors'])
+
+    def test_conflict_at_insert_only_fails_the_conflicting_row(self):
+        # A signup committed between the uniqueness check and the insert.
+        User.objects.create_user('import-2@example.com', 'Passw0rd!x', firstname='Concurrent')
+        before = queued()
+        with mock.patch('users.importer._find_conflicts', return_value={}), \
+                self.captureOnCommitCallbacks(execute=True), \
+                self.assertLogs('users.importer', 'WARNING'):
+            results = import_users([row(1), row(2), row(3)], created_by=self.admin)
+
+        self.assertEqual([result['status'] for result in results], ['created', 'error', 'created'])
+        self.assertEqual(results[1]['errors'], {'email_address': ['User with this email address already exists.']})
+        self.assertNotIn('UNIQUE', str(results[1]))
+        self.assertEqual(
+            set(User.objects.filter(email_address__startswith='import-').values_list('email_address', flat=True)),
+            {'import-1@example.com', 'import-2@example.com', 'import-3@example.com'},
+        )
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+        self.assertEqual(queued(), before + 2)
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from users.last_login import LastLoginBuffer, LocalBackend, RedisBackend, record_login, write_last_logins
+from users.models import User
+
+
+class WriteLastLoginsTests(TestCase):
+    def test_never_moves_backwards(self):
+        user = User.objects.create_user('last-login@example.com', 'Passw0rd!x', firstname='Last')
+        now = timezone.now()
+        write_last_logins({user.pk: now})
+        write_last_logins({user.pk: now - timedelta(hours=1)})
+        user.refresh_from_db()
+        self.assertEqual(user.last_login, now)
+
+
+class LastLoginBufferTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('buffer@example.com', 'Passw0rd!x', firstname='Buffer')
+        self.buffer = LastLoginBuffer(LocalBackend())
+        self.buffer._flusher = mock.Mock()  # flushed by hand
+
+    def test_coalesces_to_the_latest_login(self):
+        now = timezone.now()
+        self.buffer.record(self.user.pk, now)
+        self.buffer.record(self.user.pk, now - timedelta(minutes=1))
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, now)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_failed_flush_keeps_the_logins(self):
+        now = timezone.now()
+        self.buffer.record(self.user.pk, now)
+        with mock.patch('users.last_login.write_last_logins', side_effect=RuntimeError('db down')), \
+                self.assertLogs('users.last_login', 'ERROR'):
+            self.assertEqual(self.buffer.flush(), 0)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, now)
+
+    def test_login_during_flush_is_kept(self):
+        backend = self.buffer.backend
+        now = timezone.now()
+        backend.record(self.user.pk, now)
+        flushed = backend.pending()
+        backend.record(self.user.pk, now + timedelta(seconds=1))
+        backend.acknowledge(flushed)
+        self.assertEqual(backend.pending(), {self.user.pk: now + timedelta(seconds=1)})
+
+    @override_settings(LAST_LOGIN_WRITE_BEHIND=True)
+    def test_record_login_writes_directly_when_the_buffer_fails(self):
+        with mock.patch('users.last_login._buffer.record', side_effect=ConnectionError('redis down')), \
+                self.assertLogs('users.last_login', 'ERROR'):
+            record_login(self.user)
+        self.assertIsNotNone(User.objects.get(pk=self.user.pk).last_login)
+
+
+class RedisBackendTests(SimpleTestCase):
+    def test_timestamp_round_trip(self):
+        when = timezone.now()
+        self.assertEqual(RedisBackend.decode(RedisBackend.encode(when)), when)
@@ -0,0 +1,21 @@
+import logging
+
+from django.test import SimpleTestCase
+
+from users.log import QueueListenerHandler
+from users.metrics import LOG_RECORDS_DROPPED
+
+
+class QueueListenerHandlerTests(SimpleTestCase):
+    def test_dropped_records_are_counted(self):
+        handler = QueueListenerHandler(queue_size=1)
+        self.addCleanup(handler.close)
+        handler.listener.stop()
+        handler.listener = None  # nothing drains the queue now
+        before = LOG_RECORDS_DROPPED._value.get()
+
+        for i in range(3):
+            handler.handle(logging.makeLogRecord({'msg': f'record {i}'}))
+
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual(LOG_RECORDS_DROPPED._value.get(), before + 2)
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+
+from users.metrics import EMAILS
+from users.models import EmailOutbox
+from users.utils import queue_verification_email
+
+
+def emails_counted(kind, result):
+    return EMAILS.labels(kind, result)._value.get()
+
+
+class SendOutboxEmailsTests(TestCase):
+    def setUp(self):
+        self.entry = queue_verification_email('outbox@example.com', 'Out Box', '123456')
+
+    def test_delivers_and_clears_context(self):
+        sent = emails_counted(EmailOutbox.KIND_VERIFICATION, 'sent')
+        call_command('send_outbox_emails', stdout=mock.Mock())
+
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.status, EmailOutbox.STATUS_SENT)
+        self.assertEqual(self.entry.context, {})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('123456', mail.outbox[0].body)
+        self.assertEqual(emails_counted(EmailOutbox.KIND_VERIFICATION, 'sent'), sent + 1)
+
+    def test_gives_up_after_max_attempts(self):
+        failed = emails_counted(EmailOutbox.KIND_VERIFICATION, 'failed')
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('smtp down')), \
+                self.assertLogs('users.management.commands.send_outbox_emails', 'ERROR'):
+            call_command('send_outbox_emails', '--max-attempts=1', stdout=mock.Mock())
+
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.status, EmailOutbox.STATUS_FAILED)
+        self.assertEqual(self.entry.last_error, 'smtp down')
+        self.assertEqual(self.entry.context, {})
+        self.assertEqual(emails_counted(EmailOutbox.KIND_VERIFICATION, 'failed'), failed + 1)
@@ -0,0 +1,117 @@
+import base64
+import json
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import parse_qs, urlparse
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from users.models import User
+from users.pagination import KeysetPagination
+
+factory = APIRequestFactory()
+
+
+def api_request(path='/api/users/list-users/', **params):
+    return Request(factory.get(path, params))
+
+
+def cursor_from(link):
+    return parse_qs(urlparse(link).query)['cursor'][0]
+
+
+class CursorTests(SimpleTestCase):
+    def setUp(self):
+        self.paginator = KeysetPagination()
+        self.paginator.base_url = 'http://testserver/api/users/list-users/?page_size=2'
+
+    def test_round_trip(self):
+        position = ['2026-01-02T03:04:05.000006+00:00', '6f1c8c5e-0d7e-4c32-9e0b-0b7d9a3f2e11']
+        for reverse in (False, True):
+            with self.subTest(reverse=reverse):
+                link = self.paginator.encode_cursor(position, reverse=reverse)
+                decoded = self.paginator.decode_cursor(api_request(cursor=cursor_from(link)))
+                self.assertEqual(decoded, {'position': position, 'reverse': reverse})
+
+    def test_link_keeps_other_parameters(self):
+        link = self.paginator.encode_cursor(['a', 'b'], reverse=False)
+        self.assertEqual(parse_qs(urlparse(link).query)['page_size'], ['2'])
+
+    def test_missing_cursor(self):
+        self.assertIsNone(self.paginator.decode_cursor(api_request()))
+
+    def test_invalid_cursors(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        for cursor in ('not base64!', encode(['a', 'b']), encode({'r': True}), encode({'p': ['a']}),
+                       encode({'p': 'ab'})):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(NotFound):
+                    self.paginator.decode_cursor(api_request(cursor=cursor))
+
+    def test_position_of_model_and_mapping(self):
+        created_at = datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        user = User(created_at=created_at)
+        expected = [created_at.isoformat(), str(user.pk)]
+        self.assertEqual(self.paginator.get_position(user), expected)
+        self.assertEqual(self.paginator.get_position({'created_at': created_at, 'id': user.pk}), expected)
+
+    def test_position_filter_has_leading_range_bound(self):
+        position = [datetime(2026, 1, 2, tzinfo=dt_timezone.utc), User().pk]
+        sql = str(User.objects.filter(self.paginator.get_position_filter(position)).query)
+        self.assertIn('"users"."created_at" >=', sql)
+        sql = str(User.objects.filter(self.paginator.get_position_filter(position, reverse=True)).query)
+        self.assertIn('"users"."created_at" <=', sql)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            User.objects.create_user(f'page-{i}@example.com', 'Passw0rd!x', firstname='Page')
+        # Two rows share a timestamp so the id tie-break is exercised.
+        users = list(User.objects.order_by('created_at', 'id'))
+        User.objects.filter(pk=users[2].pk).update(created_at=users[1].created_at)
+        cls.ordered = list(User.objects.order_by('created_at', 'id').values_list('pk', flat=True))
+
+    def paginate(self, **params):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(User.objects.all(), api_request(**params))
+        return paginator, [user.pk for user in page]
+
+    def test_not_paginated_without_parameters(self):
+        self.assertIsNone(KeysetPagination().paginate_queryset(User.objects.all(), api_request()))
+
+    def test_walks_forward_and_back(self):
+        paginator, page = self.paginate(page_size=2)
+        self.assertEqual(page, self.ordered[:2])
+        self.assertIsNone(paginator.get_previous_link())
+
+        paginator, page = self.paginate(page_size=2, cursor=cursor_from(paginator.get_next_link()))
+        self.assertEqual(page, self.ordered[2:4])
+
+        last, page = self.paginate(page_size=2, cursor=cursor_from(paginator.get_next_link()))
+        self.assertEqual(page, self.ordered[4:])
+        self.assertIsNone(last.get_next_link())
+
+        paginator, page = self.paginate(page_size=2, cursor=cursor_from(last.get_previous_link()))
+        self.assertEqual(page, self.ordered[2:4])
+
+        paginator, page = self.paginate(page_size=2, cursor=cursor_from(paginator.get_previous_link()))
+        self.assertEqual(page, self.ordered[:2])
+        self.assertIsNone(paginator.get_previous_link())
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(KeysetPagination().get_page_size(api_request(page_size=10_000)), 500)
+        self.assertEqual(KeysetPagination().get_page_size(api_request(page_size=0)), 50)
+        self.assertEqual(KeysetPagination().get_page_size(api_request(page_size='x')), 50)
+
+    def test_cursor_with_invalid_position(self):
+        paginator = KeysetPagination()
+        paginator.base_url = 'http://testserver/'
+        cursor = cursor_from(paginator.encode_cursor(['not a date', 'not a uuid'], reverse=False))
+        with self.assertRaises(NotFound):
+            self.paginate(cursor=cursor)
@@ -0,0 +1,82 @@
+from django.test import SimpleTestCase, override_settings
+
+from users.phone import InvalidPhoneNumber, normalize_country_code, search_prefix, to_e164
+
+
+@override_settings(DEFAULT_PHONE_COUNTRY_CODE='254')
+class ToE164Tests(SimpleTestCase):
+    def test_national_number_with_trunk_zero(self):
+        self.assertEqual(to_e164('0712 345 678'), '+254712345678')
+
+    def test_national_number_without_trunk_zero(self):
+        self.assertEqual(to_e164('712-345-678'), '+254712345678')
+
+    def test_international_forms(self):
+        for number in ('+254 712 345 678', '00254712345678', '254712345678', '(254) 712.345.678'):
+            with self.subTest(number=number):
+                self.assertEqual(to_e164(number), '+254712345678')
+
+    def test_country_code_is_used_for_national_numbers(self):
+        self.assertEqual(to_e164('0412345678', '+61'), '+61412345678')
+        self.assertEqual(to_e164('4155550100', '001'), '+14155550100')
+
+    def test_international_number_ignores_country_code(self):
+        self.assertEqual(to_e164('+254712345678', '+1'), '+254712345678')
+
+    def test_default_country_code_setting(self):
+        with self.settings(DEFAULT_PHONE_COUNTRY_CODE='+256'):
+            self.assertEqual(to_e164('0772123456'), '+256772123456')
+
+    def test_invalid_numbers(self):
+        for number in ('junk', '123', '+0712345678', '+1234567890123456', '07x2345678'):
+            with self.subTest(number=number):
+                with self.assertRaises(InvalidPhoneNumber):
+                    to_e164(number)
+
+    def test_invalid_country_code(self):
+        with self.assertRaises(InvalidPhoneNumber):
+            to_e164('0712345678', '+0')
+
+
+class NormalizeCountryCodeTests(SimpleTestCase):
+    def test_forms(self):
+        for country_code in ('254', '+254', '00254', ' +254 '):
+            with self.subTest(country_code=country_code):
+                self.assertEqual(normalize_country_code(country_code), '+254')
+
+    def test_missing(self):
+        self.assertIsNone(normalize_country_code(None))
+        self.assertIsNone(normalize_country_code(''))
+
+    def test_invalid(self):
+        for country_code in ('0', '+2545', 'ke'):
+            with self.subTest(country_code=country_code):
+                with self.assertRaises(InvalidPhoneNumber):
+                    normalize_country_code(country_code)
+
+
+@override_settings(DEFAULT_PHONE_COUNTRY_CODE='254')
+class SearchPrefixTests(SimpleTestCase):
+    def test_national_fragment(self):
+        self.assertEqual(search_prefix('0712'), '+254712')
+        self.assertEqual(search_prefix('712'), '+254712')
+
+    def test_international_fragment(self):
+        self.assertEqual(search_prefix('+25471'), '+25471')
+        self.assertEqual(search_prefix('0025471'), '+25471')
+        self.assertEqual(search_prefix('25471'), '+25471')
+
+    def test_start_of_country_code(self):
+        self.assertEqual(search_prefix('2'), '+2')
+        self.assertEqual(search_prefix('25'), '+25')
+        self.assertEqual(search_prefix('254'), '+254')
+
+    def test_trunk_zero_alone(self):
+        self.assertEqual(search_prefix('0'), '+254')
+
+    def test_no_digits(self):
+        self.assertIsNone(search_prefix(''))
+        self.assertIsNone(search_prefix('abc'))
+
+    def test_mixed_fragment(self):
+        self.assertIsNone(search_prefix('07a1'))
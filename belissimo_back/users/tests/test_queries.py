@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.db import connection, models
+from django.test import TestCase
+
+from users.models import User
+from users.queries import supports_update_returning, update_returning, upsert_returning
+
+
+class UpdateReturningTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice@example.com', 'Passw0rd!x', firstname='Alice')
+        cls.bob = User.objects.create_user('bob@example.com', 'Passw0rd!x', firstname='Bob')
+
+    def check_update_returning(self):
+        rows = update_returning(
+            User.objects.filter(pk=self.alice.pk),
+            ['id', 'firstname', 'lastname'],
+            firstname=models.functions.Upper('firstname'),
+            lastname=models.Case(
+                models.When(firstname='Alice', then=models.Value('Matched')),
+                default=models.Value('Other'),
+            ),
+        )
+        self.assertEqual(rows, [{'id': self.alice.pk, 'firstname': 'ALICE', 'lastname': 'Matched'}])
+        self.bob.refresh_from_db()
+        self.assertEqual(self.bob.firstname, 'Bob')
+
+        rows = update_returning(User.objects.filter(pk__in=[self.alice.pk, self.bob.pk]), ['id'], lastname='Both')
+        self.assertCountEqual(rows, [{'id': self.alice.pk}, {'id': self.bob.pk}])
+
+        self.assertEqual(update_returning(User.objects.filter(firstname='Nobody'), ['id'], lastname='x'), [])
+        self.assertEqual(update_returning(User.objects.none(), ['id'], lastname='x'), [])
+
+    def test_update_returning(self):
+        self.assertTrue(supports_update_returning(connection))
+        self.check_update_returning()
+
+    def test_fallback_without_returning(self):
+        with mock.patch('users.queries.supports_update_returning', return_value=False):
+            self.check_update_returning()
+
+    def test_values_are_converted(self):
+        rows = update_returning(
+            User.objects.filter(pk=self.alice.pk), ['id', 'verified_at', 'is_active'], is_active=False,
+        )
+        self.assertEqual(rows, [{'id': self.alice.pk, 'verified_at': None, 'is_active': False}])
+
+
+class UpsertReturningTests(TestCase):
+    def candidate(self, email_address, provider='google', firstname='Social'):
+        return User(email_address=email_address, provider=provider, firstname=firstname)
+
+    def check_upsert_returning(self):
+        candidate = self.candidate('new@example.com')
+        user = upsert_returning(candidate, ['email_address'], match_fields=['provider'])
+        self.assertEqual(user.pk, candidate.pk)
+        self.assertFalse(user._state.adding)
+        self.assertEqual(User.objects.get(pk=candidate.pk).firstname, 'Social')
+
+        again = self.candidate('new@example.com', firstname='Changed')
+        existing = upsert_returning(again, ['email_address'], match_fields=['provider'])
+        self.assertEqual(existing.pk, candidate.pk)
+        self.assertNotEqual(existing.pk, again.pk)
+        self.assertEqual(existing.firstname, 'Social')
+        self.assertEqual(User.objects.get(pk=candidate.pk).firstname, 'Social')
+
+        other_provider = self.candidate('new@example.com', provider='email')
+        self.assertIsNone(upsert_returning(other_provider, ['email_address'], match_fields=['provider']))
+        self.assertEqual(User.objects.filter(email_address='new@example.com').count(), 1)
+
+    def test_upsert_returning(self):
+        self.check_upsert_returning()
+
+    def test_fallback_without_returning(self):
+        with mock.patch('users.queries.supports_update_returning', return_value=False):
+            self.check_upsert_returning()
+
+    def test_conflict_without_match_fields(self):
+        first = upsert_returning(self.candidate('any@example.com'), ['email_address'])
+        second = upsert_returning(self.candidate('any@example.com', provider='email'), ['email_address'])
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.provider, 'google')
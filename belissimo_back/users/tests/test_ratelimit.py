@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.ratelimit import LocalBackend, RateLimit
+
+
+class RateLimitTests(SimpleTestCase):
+    def test_rates(self):
+        self.assertEqual((RateLimit('x', '5/m').limit, RateLimit('x', '5/m').window), (5, 60))
+        self.assertEqual(RateLimit('x', '1/30m').window, 1800)
+        with self.assertRaises(ValueError):
+            RateLimit('x', '5 per minute')
+
+    def test_local_backend_sliding_window(self):
+        backend = LocalBackend()
+        with mock.patch('users.ratelimit.time.monotonic', return_value=100.0):
+            self.assertEqual(backend.hit('k', 2, 60), (True, 0.0))
+            self.assertEqual(backend.hit('k', 2, 60), (True, 0.0))
+            self.assertEqual(backend.hit('k', 2, 60), (False, 60.0))
+        with mock.patch('users.ratelimit.time.monotonic', return_value=160.0):
+            self.assertEqual(backend.hit('k', 2, 60), (True, 0.0))
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMIT_BACKEND='users.ratelimit.LocalBackend')
+class ThrottledResponseTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('users.ratelimit._backend', LocalBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_throttled_request_uses_the_envelope(self):
+        client = APIClient()
+        payload = {'email_address': 'nobody@example.com'}
+        self.assertEqual(client.post('/api/users/forgot-password/', payload, format='json').status_code, 200)
+
+        with self.assertLogs('users.ratelimit', 'WARNING'):
+            response = client.post('/api/users/forgot-password/', payload, format='json')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json(), {
+            'status': 'error', 'message': 'Too many requests, please try again later', 'data': None,
+        })
+        self.assertEqual(response['Retry-After'], '1800')
+
+    def test_other_errors_are_unchanged(self):
+        response = APIClient().get('/api/users/profile/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('detail', response.json())
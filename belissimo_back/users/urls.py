@@ -1,12 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import UserViewSet
+from .views import UserViewSet, DatabasePoolStatsView, LoginHashingStatsView
+from .async_views import async_login
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 
 urlpatterns = [
+    # Must precede the router so it is not taken for a user detail route.
+    path('users/login-async/', async_login, name='user_login_async'),
     path('', include(router.urls)),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('metrics/db-pool/', DatabasePoolStatsView.as_view(), name='db_pool_stats'),
+    path('metrics/login-hashing/', LoginHashingStatsView.as_view(), name='login_hashing_stats'),
 ]
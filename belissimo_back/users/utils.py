@@ -1,10 +1,14 @@
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import transaction
+from .models import EmailOutbox
+from .metrics import EMAILS
+from .perf import span
 
 
-def send_verification_email(to_email, name, verification_code):
-    """Send verification code email to user"""
+def build_verification_email(to_email, name, verification_code):
+    """Build the verification code email for a user"""
     subject = "Verify Your Bellissimo Properties"
     from_email = settings.DEFAULT_FROM_EMAIL
     to = [to_email]
@@ -33,17 +37,11 @@ The Bellissimo Properties"""
 
     msg = EmailMultiAlternatives(subject, text_content, from_email, to)
     msg.attach_alternative(html_content, "text/html")
-    
-    try:
-        msg.send()
-        return True
-    except Exception as e:
-        print(f"Error sending verification email: {e}")
-        return False
+    return msg
 
 
-def send_password_reset_email(to_email, name, reset_token):
-    """Send password reset email to user"""
+def build_password_reset_email(to_email, name, reset_token):
+    """Build the password reset email for a user"""
     subject = "Reset Your TunaresQ Password"
     from_email = settings.DEFAULT_FROM_EMAIL
     to = [to_email]
@@ -69,10 +67,39 @@ The TunaresQ Team"""
 
     msg = EmailMultiAlternatives(subject, text_content, from_email, to)
     msg.attach_alternative(html_content, "text/html")
-    
-    try:
-        msg.send()
-        return True
-    except Exception as e:
-        print(f"Error sending password reset email: {e}")
-        return False
+    return msg
+
+
+EMAIL_BUILDERS = {
+    EmailOutbox.KIND_VERIFICATION: build_verification_email,
+    EmailOutbox.KIND_PASSWORD_RESET: build_password_reset_email,
+}
+
+
+def queue_verification_email(to_email, name, verification_code):
+    """Queue the verification email in the outbox (call inside the user's transaction)"""
+    # Request-side email cost is the outbox INSERT, so it also shows up as db time.
+    # Counted on commit so a rolled-back registration is not reported as queued.
+    transaction.on_commit(lambda: EMAILS.labels(EmailOutbox.KIND_VERIFICATION, 'queued').inc())
+    with span('email'):
+        return EmailOutbox.objects.create(
+            kind=EmailOutbox.KIND_VERIFICATION,
+            to_email=to_email,
+            context={'name': name, 'verification_code': verification_code}
+        )
+
+
+def queue_password_reset_email(to_email, name, reset_token):
+    """Queue the password reset email in the outbox (call inside the user's transaction)"""
+    transaction.on_commit(lambda: EMAILS.labels(EmailOutbox.KIND_PASSWORD_RESET, 'queued').inc())
+    with span('email'):
+        return EmailOutbox.objects.create(
+            kind=EmailOutbox.KIND_PASSWORD_RESET,
+            to_email=to_email,
+            context={'name': name, 'reset_token': reset_token}
+        )
+
+
+def build_outbox_message(entry):
+    """Render the email for an outbox entry"""
+    return EMAIL_BUILDERS[entry.kind](entry.to_email, **entry.context)
@@ -1,32 +1,87 @@
 from django.shortcuts import render
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
-from drf_spectacular.utils import extend_schema, extend_schema_view
-from .custom import custom_response, custom_error_response
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from .custom import custom_response, custom_error_response, custom_json_response
 from .models import User
 from .serializers import *
 from .permissions import IsAdminRole
-from .utils import send_verification_email, send_password_reset_email
+from .pagination import KeysetPagination
+from .search import filter_users, order_by_rank
+from .export import EXPORT_FORMATS, IgnoreClientContentNegotiation, is_asgi_request, stream_users
+from .importer import ImportFileError, import_users, read_rows
+from .dbpool import pool_stats
+from .hashing import hashing_stats
+from .last_login import record_login
+from .ratelimit import PolicyRateThrottle, RateLimit
+from .utils import queue_verification_email, queue_password_reset_email
 from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
-from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.conf import settings
 from rest_framework.response import Response
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 import logging
-from django.utils.decorators import method_decorator
-from django_ratelimit.decorators import ratelimit
 from rest_framework.views import APIView
-from django.db import models
 
 logger = logging.getLogger(__name__)
 
+# Shared by UserViewSet.login and the ASGI login view.
+LOGIN_RATE_LIMITS = [
+    RateLimit('login', '20/m', key='ip'),
+    RateLimit('login', '10/15m', key='email_address'),
+]
+
+
+def login_response(user):
+    """Build the login payload and set the JWT cookies for an authenticated user"""
+    refresh = RefreshToken.for_user(user)
+    access_token = str(refresh.access_token)
+    refresh_token = str(refresh)
+
+    response_data = {
+        'access_token': access_token,
+        'user': UserSerializer(user).data,
+    }
+
+    response = custom_json_response(
+        data=response_data,
+        message='Login successful'
+    )
+
+    response.set_cookie(
+        key='access',
+        value=access_token,
+        httponly=True,
+        secure=False,
+        samesite='Lax',
+        max_age=3600
+    )
+
+    response.set_cookie(
+        key='refresh',
+        value=refresh_token,
+        httponly=True,
+        secure=False,
+        samesite='Lax',
+        max_age=7 * 24 * 3600
+    )
+
+    return response
+
+
+FIELDS_PARAMETER = OpenApiParameter(
+    'fields', str,
+    description='Comma-separated fields to return, e.g. `id,full_name,role`. Defaults to all fields.'
+)
+
+
 @extend_schema_view(
     list=extend_schema(tags=['User Management']),
-    retrieve=extend_schema(tags=['User Management']),
+    retrieve=extend_schema(tags=['User Management'], parameters=[FIELDS_PARAMETER]),
     create=extend_schema(tags=['User Management']),
     update=extend_schema(tags=['User Management']),
     partial_update=extend_schema(tags=['User Management']),
@@ -35,11 +90,16 @@ logger = logging.getLogger(__name__)
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    throttle_classes = [PolicyRateThrottle]
+    # Per-action policies, set through @action(..., rate_limits=[...])
+    rate_limits = ()
+    # Read actions that accept ?fields= sparse fieldsets.
+    sparse_fields_actions = ('list_users', 'retrieve', 'profile')
     
     def get_permissions(self):
         if self.action in ['register', 'login', 'forgot_password', 'reset_password', 'verify', 'resend_verification', 'social_register']:
             permission_classes = [AllowAny]
-        elif self.action in ['create_landlord_or_tenant', 'list_users', 'delete_user']:
+        elif self.action in ['create_landlord_or_tenant', 'import_landlords_and_tenants', 'list_users', 'export_users', 'delete_user']:
             permission_classes = [IsAdminRole]
         else:
             permission_classes = [IsAuthenticated]
@@ -63,6 +123,25 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserListSerializer
         return UserSerializer
 
+    def get_sparse_fields(self):
+        """Parsed ``?fields=`` for the read actions that support it, otherwise None"""
+        if self.action not in self.sparse_fields_actions or getattr(self, 'request', None) is None:
+            return None
+        return self.get_serializer_class().parse_fields(self.request.query_params.get('fields'))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            fields = self.get_sparse_fields()
+            if fields:
+                queryset = queryset.only(*self.get_serializer_class().columns(fields))
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
     @extend_schema(
         tags=['User Management'],
         description="Create a new landlord or tenant and send a password reset email (Admin only)."
@@ -70,7 +149,7 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], url_path='create-landlord-tenant')
     def create_landlord_or_tenant(self, request):
         """
-        Create a new landlord or tenant and send a password reset email (Admin only)
+        Create a new landlord or tenant and queue a password reset email (Admin only)
         """
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
@@ -78,51 +157,38 @@ class UserViewSet(viewsets.ModelViewSet):
                 validated_data = serializer.validated_data
                 validated_data.pop('password', None)
                 validated_data.pop('password_confirm', None)
-                user = User.objects.create_user(
-                    email_address=validated_data['email_address'],
-                    firstname=validated_data['firstname'],
-                    lastname=validated_data.get('lastname'),
-                    country_code=validated_data.get('country_code'),
-                    mobile_number=validated_data.get('mobile_number'),
-                    role=validated_data['role'],
-                    identification_number=validated_data.get('identification_number'),
-                    created_by=request.user
-                )
-                
-                # Generate password reset token (no verification code)
-                reset_token = user.generate_password_reset_token()
-                
-                # Send password reset email
-                try:
-                    email_sent = send_password_reset_email(
+                with transaction.atomic():
+                    user = User.objects.create_user(
+                        email_address=validated_data['email_address'],
+                        firstname=validated_data['firstname'],
+                        lastname=validated_data.get('lastname'),
+                        country_code=validated_data.get('country_code'),
+                        mobile_number=validated_data.get('mobile_number'),
+                        role=validated_data['role'],
+                        identification_number=validated_data.get('identification_number'),
+                        created_by=request.user
+                    )
+                    
+                    # Generate password reset token (no verification code)
+                    reset_token = user.generate_password_reset_token()
+                    
+                    # Delivered by the send_outbox_emails worker once committed
+                    queue_password_reset_email(
                         to_email=user.email_address,
                         name=user.full_name,
                         reset_token=reset_token
                     )
-                    if not email_sent:
-                        logger.warning(f"Failed to send password reset email to {user.email_address}")
-                        response_data = {
-                            'user': UserSerializer(user).data,
-                            'warning': 'Account created but password reset email could not be sent.'
-                        }
-                    else:
-                        response_data = {'user': UserSerializer(user).data}
-                except Exception as e:
-                    logger.error(f"Error sending password reset email to {user.email_address}: {str(e)}")
-                    response_data = {
-                        'user': UserSerializer(user).data,
-                        'warning': 'Account created but password reset email could not be sent.'
-                    }
                 
+                response_data = {'user': UserSerializer(user).data}
                 return custom_response(
                     data=response_data,
                     message=f"{user.role.capitalize()} created successfully",
                     status_code=status.HTTP_201_CREATED
                 )
             except IntegrityError as e:
-                logger.error(f"IntegrityError during landlord/tenant creation: {str(e)}")
+                logger.warning("IntegrityError during landlord/tenant creation: %s", e)
                 return custom_error_response(
-                    message=f"Integrity error: {str(e)}",
+                    message=unique_violation_errors(e) or f"Integrity error: {str(e)}",
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
         return custom_error_response(
@@ -130,21 +196,58 @@ class UserViewSet(viewsets.ModelViewSet):
             status_code=status.HTTP_400_BAD_REQUEST
         )
 
+    @extend_schema(
+        tags=['User Management'],
+        description=(
+            "Bulk create landlords and tenants from a CSV `file` upload or a JSON array and queue "
+            "their password reset invites. Returns a per-row result report (Admin only)."
+        )
+    )
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_landlords_and_tenants(self, request):
+        """
+        Bulk create landlords and tenants and queue password reset invites (Admin only)
+        """
+        try:
+            rows = read_rows(request)
+        except ImportFileError as e:
+            return custom_error_response(
+                message=str(e),
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = import_users(rows, created_by=request.user)
+        created = sum(1 for result in results if result['status'] == 'created')
+        return custom_response(
+            data={
+                'created': created,
+                'failed': len(results) - created,
+                'results': results
+            },
+            message=f"Imported {created} of {len(results)} users",
+            status_code=status.HTTP_200_OK
+        )
+
     @extend_schema(
         tags=['Authentication'],
         description="Register or login user with social OAuth provider (Google, Facebook, etc.)."
     )
     @action(detail=False, methods=['post'], url_path='social-register')
     def social_register(self, request):
-        serializer = SocialRegistrationSerializer(data=request.data, context={'is_social_register': True})
+        serializer = SocialRegistrationSerializer(data=request.data)
         if serializer.is_valid():
-            email = serializer.validated_data.get('email_address')
-            user = User.objects.filter(email_address=email).first()
-            if user:
-                success_message = f'Successfully logged in with {user.provider.capitalize()}!'
-            else:
+            # One INSERT ... ON CONFLICT signs new users up and existing ones in
+            try:
                 user = serializer.save()
+            except serializers.ValidationError as e:
+                return custom_error_response(
+                    message=e.detail,
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            if serializer.created:
                 success_message = f'Successfully signed up with {user.provider.capitalize()}!'
+            else:
+                success_message = f'Successfully logged in with {user.provider.capitalize()}!'
 
             refresh = RefreshToken.for_user(user)
             access_token = str(refresh.access_token)
@@ -155,10 +258,11 @@ class UserViewSet(viewsets.ModelViewSet):
                 'provider': user.provider
             }
 
-            response = JsonResponse({
-                'data': response_data,
-                'message': success_message
-            })
+            response = custom_response(
+                data=response_data,
+                message=success_message,
+                status_code=status.HTTP_200_OK
+            )
 
             response.set_cookie(
                 key='access',
@@ -178,11 +282,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 max_age=7 * 24 * 3600
             )
 
-            return custom_response(
-                data=response_data,
-                message=success_message,
-                status_code=status.HTTP_200_OK
-            )
+            return response
         else:
             return custom_error_response(
                 message=serializer.errors,
@@ -196,32 +296,23 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def register(self, request):
         """
-        Register a new user and send verification email
+        Register a new user and queue verification email
         """
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             try:
-                user = serializer.save()
-
-                try:
-                    email_sent = send_verification_email(
+                with transaction.atomic():
+                    user = serializer.save()
+                    verification_code = user.generate_verification_code()
+                    queue_verification_email(
                         to_email=user.email_address,
                         name=user.full_name,
-                        verification_code=user.verification_code
+                        verification_code=verification_code
                     )
-                    print(f"Email sent status: {email_sent}")
-                except Exception as e:
-                    print(f"Email sending error: {str(e)}")
-                    email_sent = False
 
                 response_data = {
                     'user': UserSerializer(user).data,
                 }
-                if not email_sent:
-                    response_data['warning'] = (
-                        'Account created but verification email could not be sent. '
-                        'Please use resend verification.'
-                    )
 
                 return custom_response(
                     data=response_data,
@@ -229,14 +320,19 @@ class UserViewSet(viewsets.ModelViewSet):
                     status_code=status.HTTP_201_CREATED
                 )
 
+            except serializers.ValidationError as e:
+                return custom_error_response(
+                    message=e.detail,
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
             except IntegrityError as e:
-                print(f"IntegrityError during registration: {str(e)}")
+                logger.warning("IntegrityError during registration: %s", e)
                 return custom_error_response(
                     message=f"Integrity error: {str(e)}",
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
             except Exception as e:
-                print(f"Unexpected error during registration: {str(e)}")
+                logger.exception("Unexpected error during registration")
                 return custom_error_response(
                     message="Unexpected error: " + str(e),
                     status_code=status.HTTP_400_BAD_REQUEST
@@ -251,7 +347,8 @@ class UserViewSet(viewsets.ModelViewSet):
         tags=['Authentication'],
         description="Login user and return JWT tokens."
     ) 
-    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny],
+            rate_limits=LOGIN_RATE_LIMITS)
     def login(self, request):
         """Login user and return JWT tokens - validation handled at model level"""
         data = request.data
@@ -276,60 +373,29 @@ class UserViewSet(viewsets.ModelViewSet):
                 status_code=status.HTTP_403_FORBIDDEN
             )
         
-        user.last_login = timezone.now()
-        user.save(update_fields=['last_login'])
+        record_login(user)
         
-        refresh = RefreshToken.for_user(user)
-        access_token = str(refresh.access_token)
-        refresh_token = str(refresh)
-
-        response_data = {
-            'access_token': access_token,
-            'user': UserSerializer(user).data,
-        }
-
-        response = JsonResponse({
-            'data': response_data,
-            'message': 'Login successful'
-        })
-
-        response.set_cookie(
-            key='access',
-            value=access_token,
-            httponly=True,
-            secure=False,
-            samesite='Lax',
-            max_age=3600
-        )
-
-        response.set_cookie(
-            key='refresh',
-            value=refresh_token,
-            httponly=True,
-            secure=False,
-            samesite='Lax',
-            max_age=7 * 24 * 3600
-        )
-
-        return response
+        return login_response(user)
 
     @extend_schema(
         tags=['Password Management'],
         description="Request password reset email."
     ) 
-    @method_decorator(ratelimit(key='ip', rate='1/30m', block=True))
-    @method_decorator(ratelimit(key='post:email_address', rate='1/30m', block=True))
-    @action(detail=False, methods=['post'], url_path='forgot-password')
+    @action(detail=False, methods=['post'], url_path='forgot-password', rate_limits=[
+        RateLimit('forgot_password', '1/30m', key='ip'),
+        RateLimit('forgot_password', '1/30m', key='email_address'),
+    ])
     def forgot_password(self, request):
         """Request password reset - always returns success for security"""
         serializer = PasswordResetRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
         try:
-            user = User.objects.get(email_address=serializer.validated_data['email_address'])
+            user = User.objects.get_by_email(serializer.validated_data['email_address'])
             if user.is_active:
-                reset_token = user.generate_password_reset_token()
-                send_password_reset_email(user.email_address, user.full_name, reset_token)
+                with transaction.atomic():
+                    reset_token = user.generate_password_reset_token()
+                    queue_password_reset_email(user.email_address, user.full_name, reset_token)
         except (User.DoesNotExist, ValidationError):
             pass
         
@@ -343,45 +409,51 @@ class UserViewSet(viewsets.ModelViewSet):
         tags=['Password Management'],
         description="Reset password using reset token."
     ) 
-    @action(detail=False, methods=['post'], url_path='reset-password')
+    @action(detail=False, methods=['post'], url_path='reset-password', rate_limits=[
+        RateLimit('reset_password', '10/m', key='ip'),
+    ])
     def reset_password(self, request):
         """Reset password using token"""
         serializer = PasswordResetConfirmSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
+        token = serializer.validated_data['token']
+        reset = User.objects.consume_password_reset_token(token, serializer.validated_data['new_password'])
+        if reset is not None:
+            return Response({
+                'status': True,
+                'message': 'Password reset successfully',
+                'data': {
+                    'email': reset['email_address'],
+                    'reset_at': timezone.now().isoformat()
+                }
+            }, status=status.HTTP_200_OK)
+        
+        # The token was not consumed; look it up only to explain why.
         try:
-            user = User.objects.get(password_reset_token=serializer.validated_data['token'])
-            is_valid, message = user.verify_password_reset_token(serializer.validated_data['token'])
-            
-            if is_valid:
-                user.reset_password(serializer.validated_data['new_password'])
-                return Response({
-                    'status': True,
-                    'message': 'Password reset successfully',
-                    'data': {
-                        'email': user.email_address,
-                        'reset_at': timezone.now().isoformat()
-                    }
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response({
-                    'status': False,
-                    'message': message,
-                    'data': None
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
+            user = User.objects.get_by_password_reset_token(token)
         except User.DoesNotExist:
             return Response({
                 'status': False,
                 'message': 'Invalid or expired reset token',
                 'data': None
             }, status=status.HTTP_400_BAD_REQUEST)
+        
+        is_valid, message = user.verify_password_reset_token(token)
+        return Response({
+            'status': False,
+            'message': 'Invalid or expired reset token' if is_valid else message,
+            'data': None
+        }, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(
         tags=['Account Verification'],
         description="Verify user account with email address and verification code."
     ) 
-    @action(detail=False, methods=['post'], url_path='verify-account')
+    @action(detail=False, methods=['post'], url_path='verify-account', rate_limits=[
+        RateLimit('verify', '20/m', key='ip'),
+        RateLimit('verify', '5/10m', key='email_address'),
+    ])
     def verify(self, request):
         """
         Verify user account with email address and verification code
@@ -392,7 +464,7 @@ class UserViewSet(viewsets.ModelViewSet):
             code = serializer.validated_data['verification_code']
             
             try:
-                user = User.objects.get(email_address=email_address)
+                user = User.objects.get_by_email(email_address)
                 
                 if user.verify_code(code):
                     refresh = RefreshToken.for_user(user)
@@ -403,10 +475,10 @@ class UserViewSet(viewsets.ModelViewSet):
                         'user': UserSerializer(user).data
                     }
 
-                    response = JsonResponse({
-                        'data': response_data,
-                        'message': 'Account verified successfully'
-                    })
+                    response = custom_response(
+                        data=response_data,
+                        message='Account verified successfully'
+                    )
 
                     response.set_cookie(
                         key='access',
@@ -450,7 +522,10 @@ class UserViewSet(viewsets.ModelViewSet):
         tags=['Account Verification'],
         description="Resend verification code to user's email."
     ) 
-    @action(detail=False, methods=['post'], url_path='resend-verification-code')
+    @action(detail=False, methods=['post'], url_path='resend-verification-code', rate_limits=[
+        RateLimit('resend_verification', '10/m', key='ip'),
+        RateLimit('resend_verification', '3/h', key='email_address'),
+    ])
     def resend_verification(self, request):
         """
         Resend verification code using email address
@@ -464,7 +539,7 @@ class UserViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            user = User.objects.get(email_address=email_address)
+            user = User.objects.get_by_email(email_address)
         
             if user.is_verified:
                 return custom_error_response(
@@ -472,23 +547,17 @@ class UserViewSet(viewsets.ModelViewSet):
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
         
-            user.generate_verification_code()
+            with transaction.atomic():
+                verification_code = user.generate_verification_code()
+                queue_verification_email(
+                    to_email=user.email_address,
+                    name=user.full_name,
+                    verification_code=verification_code
+                )
         
-            email_sent = send_verification_email(
-                to_email=user.email_address,
-                name=user.full_name,
-                verification_code=user.verification_code
+            return custom_response(
+                message='Verification code sent successfully to your email'
             )
-        
-            if email_sent:
-                return custom_response(
-                    message='Verification code sent successfully to your email'
-                )
-            else:
-                return custom_error_response(
-                    message='Failed to send verification email. Please try again later.',
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
             
         except User.DoesNotExist:
             return custom_response(
@@ -497,14 +566,15 @@ class UserViewSet(viewsets.ModelViewSet):
     
     @extend_schema(
         tags=['User Profile'],
-        description="Get current user profile information."
+        description="Get current user profile information.",
+        parameters=[FIELDS_PARAMETER]
     ) 
     @action(detail=False, methods=['get'])
     def profile(self, request):
         """
         Get current user profile
         """
-        serializer = UserSerializer(request.user)
+        serializer = self.get_serializer(request.user)
         return custom_response(
             data=serializer.data,
             message='Profile retrieved successfully'
@@ -514,7 +584,8 @@ class UserViewSet(viewsets.ModelViewSet):
         tags=['User Profile'],
         description="Update current user profile information."
     ) 
-    @action(detail=False, methods=['put', 'patch'], url_path='profile')
+    @profile.mapping.put
+    @profile.mapping.patch
     def update_profile(self, request):
         """
         Update current user profile
@@ -537,37 +608,65 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @extend_schema(
         tags=['User Management'],
-        description="List all users with optional filtering by role, name, or phone number (Admin only)."
+        description=(
+            "List all users with optional filtering by role, name, or phone number (Admin only). "
+            "Pass `page_size` and/or `cursor` to page through results ordered by creation time."
+        ),
+        parameters=[FIELDS_PARAMETER]
     )
-    @action(detail=False, methods=['get'], url_path='list-users')
+    @action(detail=False, methods=['get'], url_path='list-users', pagination_class=KeysetPagination)
     def list_users(self, request):
         """
         List all users with optional filtering by role, name, or phone number (Admin only)
         """
-        queryset = self.get_queryset()
-        
-        role = request.query_params.get('role')
-        if role in ['landlord', 'tenant', 'admin']:
-            queryset = queryset.filter(role=role)
-        
-        name = request.query_params.get('name')
-        if name:
-            queryset = queryset.filter(
-                models.Q(firstname__icontains=name) | 
-                models.Q(lastname__icontains=name)
-            )
+        # Rows are fetched with .values() and rendered without building
+        # model instances; only the columns behind ?fields= are selected.
+        fields = self.get_sparse_fields()
+        columns = UserListSerializer.columns(fields)
+        queryset = filter_users(self.get_queryset(), request.query_params)
         
-        phone = request.query_params.get('phone')
-        if phone:
-            queryset = queryset.filter(mobile_number__icontains=phone)
-        
-        serializer = UserListSerializer(queryset, many=True)
+        page = self.paginate_queryset(
+            queryset.values(*dict.fromkeys(columns + list(KeysetPagination.ordering)))
+        )
+        if page is not None:
+            return self.get_paginated_response(UserListSerializer.represent_rows(page, fields))
+
+        rows = order_by_rank(queryset).values(*columns)
         return custom_response(
-            data={'users': serializer.data},
+            data={'users': UserListSerializer.represent_rows(rows, fields)},
             message='Users retrieved successfully',
             status_code=status.HTTP_200_OK
         )
 
+    @extend_schema(
+        tags=['User Management'],
+        description=(
+            "Stream users matching the role, name and phone filters as CSV (`type=csv`, default) "
+            "or newline-delimited JSON (`type=ndjson`) (Admin only)."
+        )
+    )
+    @action(detail=False, methods=['get'], url_path='export',
+            content_negotiation_class=IgnoreClientContentNegotiation)
+    def export_users(self, request):
+        """
+        Stream a filtered user export with constant memory (Admin only)
+        """
+        export_format = request.query_params.get('type', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return custom_error_response(
+                message=f"Unsupported export type '{export_format}'. Use 'csv' or 'ndjson'.",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = filter_users(self.get_queryset(), request.query_params)
+        content_type, extension = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            stream_users(queryset, export_format, asynchronous=is_asgi_request(request)),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="users.{extension}"'
+        return response
+
     @extend_schema(
         tags=['User Management'],
         description="Delete a user by ID (Admin only)."
@@ -593,4 +692,38 @@ class UserViewSet(viewsets.ModelViewSet):
             data={'deleted_user': user_info},
             message=f"{instance.role.capitalize()} deleted successfully",
             status_code=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Database connection pool usage for the worker serving the request (Admin only)
+    """
+    permission_classes = [IsAdminRole]
+
+    @extend_schema(
+        tags=['Monitoring'],
+        description="Database connection pool size and wait-time statistics for this worker (Admin only)."
+    )
+    def get(self, request):
+        return custom_response(
+            data=pool_stats(),
+            message='Database pool statistics retrieved successfully'
+        )
+
+
+class LoginHashingStatsView(APIView):
+    """
+    Login password hashing pool queue depth for the worker serving the request (Admin only)
+    """
+    permission_classes = [IsAdminRole]
+
+    @extend_schema(
+        tags=['Monitoring'],
+        description="Login hashing pool queue depth and admission counters for this worker (Admin only)."
+    )
+    def get(self, request):
+        return custom_response(
+            data=hashing_stats(),
+            message='Login hashing statistics retrieved successfully'
+        )